@@ -0,0 +1,240 @@
+import random
+
+# --- Рушій шашок без залежності від pygame ---
+# Позиція — три 32-бітні маски (білі, чорні, дамки) по темних полях дошки 8x8.
+# Індекс поля: row * 4 + col // 2, де row 0 — верхній ряд, як у Board з main.py; на темних полях col % 2 == (row + 1) % 2.
+# Правила повторюють Board.valid_moves: прості шашки ходять і рубають лише вперед, дамки далекобійні,
+# збиті шашки знімаються одразу під час ланцюжка, шашка, що дійшла до краю під час рубки, продовжує її як дамка
+# (але, як і в Board.move_piece, дамкою стає лише тоді, коли закінчує хід на останньому ряду),
+# з кількох рубок однієї шашки лишаються найдовші (одна на кожне кінцеве поле).
+# legal_moves застосовує правила до всієї сторони: рубати обов'язково, і лише найдовшим ланцюжком серед усіх шашок.
+
+# --- Кольори ---
+WHITE, BLACK = 0, 1
+
+ROWS, COLS = 8, 8
+SQUARES = 32
+ALL_SQUARES = (1 << SQUARES) - 1
+
+# --- Напрямки: (-1,-1), (-1,1), (1,-1), (1,1); порядок як у Board ---
+DIRECTIONS = ((-1, -1), (-1, 1), (1, -1), (1, 1))
+ALL_DIRECTIONS = (0, 1, 2, 3)
+FORWARD_DIRECTIONS = ((0, 1), (2, 3))  # білі йдуть угору, чорні — вниз
+PROMOTION_ROW = (0, ROWS - 1)
+
+# --- Оцінка: як evaluate_board — шашка 10 + 0.5 за кожен пройдений ряд, дамка 25 ---
+MAN_VALUE = 10
+KING_VALUE = 25
+ADVANCE_BONUS = 0.5
+
+def square(row, col):
+    return row * 4 + col // 2
+
+def square_row(sq):
+    return sq >> 2
+
+def square_col(sq):
+    row = sq >> 2
+    return (sq & 3) * 2 + (1 - row % 2)
+
+def iter_bits(mask):
+    while mask:
+        bit = mask & -mask
+        yield bit.bit_length() - 1
+        mask ^= bit
+
+# --- Попередньо обчислені таблиці ---
+# RAYS[sq][d] — поля вздовж діагоналі від sq (для далекобійних дамок),
+# NEIGHBOUR_BITS[sq][d] — біт сусіднього поля, JUMPS[sq][d] — (поле, через яке б'ють, поле приземлення)
+RAYS = []
+NEIGHBOUR_BITS = []
+JUMPS = []
+for _sq in range(SQUARES):
+    _rays, _neighbours, _jumps = [], [], []
+    for _dr, _dc in DIRECTIONS:
+        _ray = []
+        _r, _c = square_row(_sq) + _dr, square_col(_sq) + _dc
+        while 0 <= _r < ROWS and 0 <= _c < COLS:
+            _ray.append(square(_r, _c))
+            _r += _dr
+            _c += _dc
+        _rays.append(tuple(_ray))
+        _neighbours.append(1 << _ray[0] if _ray else 0)
+        _jumps.append((_ray[0], _ray[1]) if len(_ray) >= 2 else None)
+    RAYS.append(tuple(_rays))
+    NEIGHBOUR_BITS.append(tuple(_neighbours))
+    JUMPS.append(tuple(_jumps))
+
+ROW_MASKS = tuple(sum(1 << square(row, col) for col in range(COLS) if col % 2 == (row + 1) % 2) for row in range(ROWS))
+PROMOTION_MASKS = (ROW_MASKS[PROMOTION_ROW[WHITE]], ROW_MASKS[PROMOTION_ROW[BLACK]])
+
+# Вартість простої шашки на кожному полі для кожного кольору
+MAN_SQUARE_VALUES = (
+    tuple(MAN_VALUE + (ROWS - 1 - square_row(sq)) * ADVANCE_BONUS for sq in range(SQUARES)),
+    tuple(MAN_VALUE + square_row(sq) * ADVANCE_BONUS for sq in range(SQUARES)),
+)
+
+# --- Хешування Зобріста: випадкове число на кожне (вид шашки, поле) і на чергу чорних ---
+# Вид шашки: колір * 2 + дамка
+_zobrist_random = random.Random(0xC4EC)
+ZOBRIST_PIECES = [[_zobrist_random.getrandbits(64) for _ in range(SQUARES)] for _ in range(4)]
+ZOBRIST_SIDE = _zobrist_random.getrandbits(64)
+
+# --- Хід: кортеж (з поля, на поле, збиті поля по порядку, чи стає дамкою) ---
+class Position:
+    def __init__(self, white=0, black=0, kings=0, side=WHITE):
+        self.pieces = [white, black]
+        self.kings = kings
+        self.side = side
+        self.undo_stack = []
+        self.hash = self.compute_hash()
+
+    @classmethod
+    def from_grid(cls, grid, side):
+        # grid — 8x8, на кожному полі 0 або (колір, дамка)
+        position = cls(side=side)
+        for row in range(ROWS):
+            for col in range(COLS):
+                cell = grid[row][col]
+                if cell == 0: continue
+                color, king = cell
+                bit = 1 << square(row, col)
+                position.pieces[color] |= bit
+                if king:
+                    position.kings |= bit
+        position.hash = position.compute_hash()
+        return position
+
+    def compute_hash(self):
+        key = 0
+        for color in (WHITE, BLACK):
+            for sq in iter_bits(self.pieces[color]):
+                key ^= ZOBRIST_PIECES[color * 2 + (self.kings >> sq & 1)][sq]
+        if self.side == BLACK: key ^= ZOBRIST_SIDE
+        return key
+
+    def occupied(self):
+        return self.pieces[WHITE] | self.pieces[BLACK]
+
+    def winner(self):
+        if not self.pieces[BLACK]:
+            return WHITE
+        if not self.pieces[WHITE]:
+            return BLACK
+        return None
+
+    # --- Генерація ходів ---
+    def _find_captures(self, sq, king, color, occupied, enemies, path, results):
+        # Рубки продовжуються з поля sq; occupied і enemies уже без шашки, що ходить, і без збитих
+        found = False
+        for d in (ALL_DIRECTIONS if king else FORWARD_DIRECTIONS[color]):
+            if king:
+                victim = -1
+                for target in RAYS[sq][d]:
+                    bit = 1 << target
+                    if not occupied & bit:
+                        if victim >= 0:
+                            found = True
+                            victim_bit = 1 << victim
+                            self._find_captures(target, True, color, occupied & ~victim_bit, enemies & ~victim_bit,
+                                                path + (victim,), results)
+                    elif enemies & bit and victim < 0:
+                        victim = target
+                    else:
+                        break
+            else:
+                jump = JUMPS[sq][d]
+                if jump is None: continue
+                over, land = jump
+                if enemies & (1 << over) and not occupied & (1 << land):
+                    found = True
+                    over_bit = 1 << over
+                    self._find_captures(land, bool(PROMOTION_MASKS[color] & (1 << land)), color,
+                                        occupied & ~over_bit, enemies & ~over_bit, path + (over,), results)
+        if not found and path:
+            results[sq] = path
+
+    def piece_moves(self, sq):
+        # Ходи однієї шашки: найдовші рубки, а якщо рубати нічим — тихі ходи
+        bit = 1 << sq
+        color = WHITE if self.pieces[WHITE] & bit else BLACK
+        king = bool(self.kings & bit)
+        occupied = self.occupied() & ~bit
+        captures = {}
+        self._find_captures(sq, king, color, occupied, self.pieces[1 - color], (), captures)
+        if captures:
+            longest = max(len(path) for path in captures.values())
+            return [(sq, to_sq, path, not king and bool(PROMOTION_MASKS[color] & (1 << to_sq)))
+                    for to_sq, path in captures.items() if len(path) == longest]
+        moves = []
+        empty = ~occupied & ALL_SQUARES
+        if king:
+            for d in ALL_DIRECTIONS:
+                for target in RAYS[sq][d]:
+                    if not empty & (1 << target): break
+                    moves.append((sq, target, (), False))
+        else:
+            for d in FORWARD_DIRECTIONS[color]:
+                target_bit = NEIGHBOUR_BITS[sq][d]
+                if target_bit & empty:
+                    moves.append((sq, target_bit.bit_length() - 1, (), bool(target_bit & PROMOTION_MASKS[color])))
+        return moves
+
+    def legal_moves(self):
+        # Усі дозволені ходи сторони, що ходить. Якщо є рубка, лишаються тільки найдовші ланцюжки, тож за кількістю
+        # збитих вони рівні — першими йдуть ті, що збивають більше дамок, потім з перетворенням на дамку.
+        # Без рубок першими йдуть ходи з перетворенням; за рівності — порядок рядків, як на дошці в main.py
+        moves = []
+        for sq in iter_bits(self.pieces[self.side]):
+            moves.extend(self.piece_moves(sq))
+        longest = max((len(move[2]) for move in moves), default=0)
+        if longest:
+            # Тихі ходи й коротші ланцюжки інших шашок заборонені
+            kings = self.kings
+            captures = [move for move in moves if len(move[2]) == longest]
+            captures.sort(key=lambda move: (sum(kings >> sq & 1 for sq in move[2]), move[3]), reverse=True)
+            return captures
+        moves.sort(key=lambda move: move[3], reverse=True)
+        return moves
+
+    # --- Виконання та відкат ходу ---
+    def make_move(self, move):
+        from_sq, to_sq, captures, crowns = move
+        self.undo_stack.append((self.pieces[WHITE], self.pieces[BLACK], self.kings, self.side, self.hash))
+        from_bit, to_bit = 1 << from_sq, 1 << to_sq
+        color = self.side
+        enemy_kind = (1 - color) * 2
+        key = self.hash ^ ZOBRIST_SIDE
+        captured_mask = 0
+        for sq in captures:
+            captured_mask |= 1 << sq
+            key ^= ZOBRIST_PIECES[enemy_kind + (self.kings >> sq & 1)][sq]
+        # Дамка може завершити рубку на полі, з якого почала, тож без XOR
+        self.pieces[color] = (self.pieces[color] & ~from_bit) | to_bit
+        self.pieces[1 - color] &= ~captured_mask
+        kings = self.kings & ~captured_mask
+        if kings & from_bit:
+            kings = (kings & ~from_bit) | to_bit
+        elif crowns:
+            kings |= to_bit
+        key ^= ZOBRIST_PIECES[color * 2 + (self.kings >> from_sq & 1)][from_sq] ^ ZOBRIST_PIECES[color * 2 + (kings >> to_sq & 1)][to_sq]
+        self.kings = kings
+        self.side = 1 - color
+        self.hash = key
+
+    def unmake_move(self):
+        white, black, self.kings, self.side, self.hash = self.undo_stack.pop()
+        self.pieces[WHITE], self.pieces[BLACK] = white, black
+
+    # --- Оцінка ---
+    def evaluate(self, color):
+        # Матеріал і просування простих шашок з погляду color
+        score = 0
+        for side in (WHITE, BLACK):
+            pieces = self.pieces[side]
+            side_score = bin(pieces & self.kings).count("1") * KING_VALUE
+            values = MAN_SQUARE_VALUES[side]
+            for sq in iter_bits(pieces & ~self.kings):
+                side_score += values[sq]
+            score += side_score if side == color else -side_score
+        return score
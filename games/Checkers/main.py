@@ -2,7 +2,8 @@ import pygame
 import asyncio
 import sys
 import random
-import copy
+from engine import Position, WHITE, BLACK, square, square_row, square_col
+from search import TranspositionTable, SearchClock, BOUND_EXACT, BOUND_LOWER, BOUND_UPPER, OPPOSITE_BOUND
 
 # --- КОНСТАНТИ ГРИ ---
 BOARD_SIZE = 800
@@ -51,6 +52,13 @@ DIFFICULTY_MEDIUM = 1
 DIFFICULTY_HARD = 2
 CURRENT_BOT_DIFFICULTY = None
 
+# --- ПОШУК СКЛАДНОГО БОТА ---
+BOT_THINK_TIME_MS = 1000      # бюджет часу на хід; ітеративне заглиблення зупиняється, коли його вичерпано
+BOT_MAX_SEARCH_DEPTH = 64
+BOT_TT_SIZE_MB = 16
+transposition_table = TranspositionTable(BOT_TT_SIZE_MB)
+search_clock = SearchClock()
+
 PLAYER_HUMAN_COLOR = None
 BOT_COLOR = None
 
@@ -219,20 +227,56 @@ class Board:
                     piece.draw(win)
 
     def move_piece(self, piece, row, col, skipped_pieces=[]):
-        self.board[piece.row][piece.col] = 0 
-        piece.move(row, col) 
-        self.board[row][col] = piece
-
+        # Збиті шашки знімаються до того, як шашка стане на нове поле: дамка може закінчити рубку там, де стояла збита
         if skipped_pieces:
             for skipped_piece in skipped_pieces:
                 self.remove_piece(skipped_piece)
 
+        self.board[piece.row][piece.col] = 0 
+        piece.move(row, col) 
+        self.board[row][col] = piece
+
         if (piece.color == WHITE_PIECE and piece.row == 0) or \
            (piece.color == BLACK_PIECE and piece.row == ROWS - 1):
             if not piece.king: 
                 piece.make_king()
                 game_logs.append(f"Шашка {piece.get_coords_str()} стала дамкою!")
 
+    def apply_move(self, piece, row, col, skipped_pieces=()):
+        # Хід на місці, без копіювання дошки: переміщення, зняття збитих шашок (увесь ланцюжок рубок),
+        # перетворення на дамку та лічильники шашок. Повертає запис, за яким undo_move відновлює дошку
+        undo_record = (piece, piece.row, piece.col, piece.king, list(skipped_pieces))
+        for skipped_piece in skipped_pieces:
+            self.board[skipped_piece.row][skipped_piece.col] = 0
+            if skipped_piece.color == BLACK_PIECE:
+                self.black_left -= 1
+            else:
+                self.white_left -= 1
+        self.board[piece.row][piece.col] = 0
+        piece.move(row, col)
+        self.board[row][col] = piece
+        if (piece.color == WHITE_PIECE and row == 0) or (piece.color == BLACK_PIECE and row == ROWS - 1):
+            piece.king = True
+        return undo_record
+
+    def undo_move(self, undo_record):
+        piece, row, col, was_king, skipped_pieces = undo_record
+        self.board[piece.row][piece.col] = 0
+        piece.move(row, col)
+        piece.king = was_king
+        self.board[row][col] = piece
+        for skipped_piece in skipped_pieces:
+            self.board[skipped_piece.row][skipped_piece.col] = skipped_piece
+            if skipped_piece.color == BLACK_PIECE:
+                self.black_left += 1
+            else:
+                self.white_left += 1
+
+    def to_position(self, side_color):
+        # Позиція для рушія (бітові маски); на дошку ходи з рушія повертає engine_move_to_board
+        grid = [[(WHITE if p.color == WHITE_PIECE else BLACK, p.king) if p != 0 else 0 for p in row] for row in self.board]
+        return Position.from_grid(grid, WHITE if side_color == WHITE_PIECE else BLACK)
+
     def remove_piece(self, piece_to_remove):
         r, c = piece_to_remove.row, piece_to_remove.col
         actual_piece_on_board = self.get_piece(r, c)
@@ -287,25 +331,10 @@ class Board:
                         if potential_skipped: 
                             capture_pos = (temp_row, temp_col)
                             new_skipped_path = path_skipped_pieces + [potential_skipped]
-                            temp_board_for_recursion = copy.deepcopy(board_state)
-                            
-                            piece_to_move_sim = temp_board_for_recursion.get_piece(current_row, current_col)
-                            skipped_sim = temp_board_for_recursion.get_piece(potential_skipped.row, potential_skipped.col)
-
-                            if piece_to_move_sim and skipped_sim:
-                                temp_board_for_recursion.board[current_row][current_col] = 0
-                                piece_to_move_sim.row, piece_to_move_sim.col = capture_pos[0], capture_pos[1]
-                                temp_board_for_recursion.board[capture_pos[0]][capture_pos[1]] = piece_to_move_sim
-                                temp_board_for_recursion.remove_piece(skipped_sim)
-
-                                if (piece_to_move_sim.color == WHITE_PIECE and capture_pos[0] == 0) or \
-                                (piece_to_move_sim.color == BLACK_PIECE and capture_pos[0] == ROWS - 1):
-                                    if not piece_to_move_sim.king:
-                                        piece_to_move_sim.make_king()
-                            else:
-                                break
-
-                            recursive_captures = self._find_all_captures(piece_to_move_sim, temp_board_for_recursion, capture_pos[0], capture_pos[1], new_skipped_path)
+                            # Крок рубки робимо прямо на дошці й відкочуємо після пошуку продовження
+                            step_undo = board_state.apply_move(piece, capture_pos[0], capture_pos[1], [potential_skipped])
+                            recursive_captures = self._find_all_captures(piece, board_state, capture_pos[0], capture_pos[1], new_skipped_path)
+                            board_state.undo_move(step_undo)
                             
                             if not recursive_captures: 
                                 all_capture_paths[capture_pos] = new_skipped_path
@@ -339,24 +368,9 @@ class Board:
                         found_any_capture_in_this_step = True
                         new_skipped_path = path_skipped_pieces + [target_piece_on_board]
 
-                        temp_board_for_recursion = copy.deepcopy(board_state)
-                        piece_to_move_sim = temp_board_for_recursion.get_piece(current_row, current_col)
-                        skipped_sim = temp_board_for_recursion.get_piece(target_piece_on_board.row, target_piece_on_board.col)
-
-                        if piece_to_move_sim and skipped_sim:
-                            temp_board_for_recursion.board[current_row][current_col] = 0
-                            piece_to_move_sim.row, piece_to_move_sim.col = capture_row, capture_col
-                            temp_board_for_recursion.board[capture_row][capture_col] = piece_to_move_sim
-                            temp_board_for_recursion.remove_piece(skipped_sim)
-
-                            if (piece_to_move_sim.color == WHITE_PIECE and capture_row == 0) or \
-                               (piece_to_move_sim.color == BLACK_PIECE and capture_row == ROWS - 1):
-                                if not piece_to_move_sim.king:
-                                    piece_to_move_sim.make_king()
-                            
-                            recursive_captures = self._find_all_captures(piece_to_move_sim, temp_board_for_recursion, capture_row, capture_col, new_skipped_path)
-                        else:
-                            continue
+                        step_undo = board_state.apply_move(piece, capture_row, capture_col, [target_piece_on_board])
+                        recursive_captures = self._find_all_captures(piece, board_state, capture_row, capture_col, new_skipped_path)
+                        board_state.undo_move(step_undo)
 
                         if not recursive_captures: 
                             all_capture_paths[(capture_row, capture_col)] = new_skipped_path
@@ -409,113 +423,139 @@ class Board:
             return moves
 
 # --- АЛГОРИТМ MINIMAX ДЛЯ БОТА (СКЛАДНА СКЛАДНІСТЬ) ---
-def evaluate_board(board, bot_color, opponent_color):
-    score = 0
-    for r in range(ROWS):
-        for c in range(COLS):
-            piece = board.get_piece(r, c)
-            if piece != 0:
-                value = 10
-                if piece.king:
-                    value = 25
-                
-                if piece.color == bot_color:
-                    score += value
-                    if not piece.king:
-                        if bot_color == WHITE_PIECE:
-                            score += (ROWS - 1 - r) * 0.5 
-                        else: 
-                            score += r * 0.5 
-                else: 
-                    score -= value
-                    if not piece.king:
-                        if opponent_color == WHITE_PIECE:
-                            score -= (ROWS - 1 - r) * 0.5
-                        else: 
-                            score -= r * 0.5
-    return score
-
-def minimax(board, depth, maximizing_player, alpha, beta, bot_color, opponent_color):
-    if depth == 0 or board.winner() is not None:
-        return evaluate_board(board, bot_color, opponent_color), board 
+def minimax(position, depth, maximizing_player, alpha, beta, bot_side):
+    # Пошук іде на бітових масках рушія; повертає оцінку та головний варіант — список ходів, перший із яких найкращий.
+    # Перший хід записується завжди, тож варіант порожній лише тоді, коли ходів немає, пошук зупинено або спрацювала таблиця
+    if search_clock.tick():
+        return 0, []
+    if depth == 0 or position.winner() is not None:
+        return position.evaluate(bot_side), []
+
+    # У таблиці транспозицій оцінка зберігається з погляду сторони, що ходить
+    sign = 1 if maximizing_player else -1
+    entry = transposition_table.probe(position.hash)
+    tt_move = None
+    if entry is not None:
+        tt_move = entry[4]
+        if entry[1] >= depth:
+            tt_score = entry[3] * sign
+            tt_bound = entry[2] if maximizing_player else OPPOSITE_BOUND[entry[2]]
+            if tt_bound == BOUND_EXACT or (tt_bound == BOUND_LOWER and tt_score >= beta) or \
+               (tt_bound == BOUND_UPPER and tt_score <= alpha):
+                return tt_score, []
+
+    moves = position.legal_moves()
+    if tt_move in moves:
+        # Найкращий хід із таблиці перебирається першим
+        moves.remove(tt_move)
+        moves.insert(0, tt_move)
+    alpha_original, beta_original = alpha, beta
 
     if maximizing_player:
         max_eval = float('-inf')
-        best_board_state_for_max = None
-        current_board_state = copy.deepcopy(board) 
-
-        bot_pieces = [current_board_state.get_piece(r,c) for r in range(ROWS) for c in range(COLS) if current_board_state.get_piece(r,c) != 0 and current_board_state.get_piece(r,c).color == bot_color]
+        best_line_for_max = []
 
-        for piece_sim in bot_pieces:
-            if current_board_state.get_piece(piece_sim.row, piece_sim.col) == 0:
-                continue
-
-            moves = current_board_state.valid_moves(piece_sim)
-            
-            for move_pos, skipped_pieces_sim in moves.items():
-                temp_board_sim = copy.deepcopy(current_board_state)
-                temp_piece_to_move_sim = temp_board_sim.get_piece(piece_sim.row, piece_sim.col) 
-                
-                actual_skipped_on_temp_board = []
-                if skipped_pieces_sim: 
-                    for sp_sim in skipped_pieces_sim:
-                        skipped_on_temp = temp_board_sim.get_piece(sp_sim.row, sp_sim.col)
-                        if skipped_on_temp:
-                             actual_skipped_on_temp_board.append(skipped_on_temp)
-                
-                if temp_piece_to_move_sim:
-                    temp_board_sim.move_piece(temp_piece_to_move_sim, move_pos[0], move_pos[1], actual_skipped_on_temp_board)
-                    evaluation, _ = minimax(temp_board_sim, depth - 1, False, alpha, beta, bot_color, opponent_color)
+        for move in moves:
+            position.make_move(move)
+            evaluation, line = minimax(position, depth - 1, False, alpha, beta, bot_side)
+            position.unmake_move()
+            if search_clock.stopped:
+                return 0, []
 
-                    if evaluation > max_eval:
-                        max_eval = evaluation
-                        best_board_state_for_max = temp_board_sim 
+            if evaluation > max_eval or not best_line_for_max:
+                max_eval = evaluation
+                best_line_for_max = [move] + line
 
-                    alpha = max(alpha, evaluation)
-                    if beta <= alpha:
-                        break 
+            alpha = max(alpha, evaluation)
             if beta <= alpha:
                 break
-        return max_eval, best_board_state_for_max
+        best_eval, best_line = max_eval, best_line_for_max
 
     else: # minimizing_player
         min_eval = float('inf')
-        best_board_state_for_min = None
-        current_board_state = copy.deepcopy(board)
-
-        opponent_pieces = [current_board_state.get_piece(r,c) for r in range(ROWS) for c in range(COLS) if current_board_state.get_piece(r,c) != 0 and current_board_state.get_piece(r,c).color == opponent_color]
-
-        for piece_sim in opponent_pieces:
-            if current_board_state.get_piece(piece_sim.row, piece_sim.col) == 0:
-                continue
+        best_line_for_min = []
 
-            moves = current_board_state.valid_moves(piece_sim)
+        for move in moves:
+            position.make_move(move)
+            evaluation, line = minimax(position, depth - 1, True, alpha, beta, bot_side)
+            position.unmake_move()
+            if search_clock.stopped:
+                return 0, []
 
-            for move_pos, skipped_pieces_sim in moves.items():
-                temp_board_sim = copy.deepcopy(current_board_state)
-                temp_piece_to_move_sim = temp_board_sim.get_piece(piece_sim.row, piece_sim.col)
+            if evaluation < min_eval or not best_line_for_min:
+                min_eval = evaluation
+                best_line_for_min = [move] + line
 
-                actual_skipped_on_temp_board = []
-                if skipped_pieces_sim:
-                    for sp_sim in skipped_pieces_sim:
-                        skipped_on_temp = temp_board_sim.get_piece(sp_sim.row, sp_sim.col)
-                        if skipped_on_temp:
-                            actual_skipped_on_temp_board.append(skipped_on_temp)
-                
-                if temp_piece_to_move_sim:
-                    temp_board_sim.move_piece(temp_piece_to_move_sim, move_pos[0], move_pos[1], actual_skipped_on_temp_board)
-                    evaluation, _ = minimax(temp_board_sim, depth - 1, True, alpha, beta, bot_color, opponent_color)
-
-                    if evaluation < min_eval:
-                        min_eval = evaluation
-                        best_board_state_for_min = temp_board_sim
-
-                    beta = min(beta, evaluation)
-                    if beta <= alpha:
-                        break
+            beta = min(beta, evaluation)
             if beta <= alpha:
                 break
-        return min_eval, best_board_state_for_min
+        best_eval, best_line = min_eval, best_line_for_min
+
+    if best_eval <= alpha_original:
+        bound = BOUND_UPPER
+    elif best_eval >= beta_original:
+        bound = BOUND_LOWER
+    else:
+        bound = BOUND_EXACT
+    transposition_table.store(position.hash, depth, bound if maximizing_player else OPPOSITE_BOUND[bound],
+                              best_eval * sign, best_line[0] if best_line else None)
+    return best_eval, best_line
+
+def search_best_move(position, think_time_ms=None, max_depth=None):
+    # Ітеративне заглиблення, доки не вичерпано бюджет часу: (найкращий хід, оцінка, головний варіант)
+    # для сторони, що ходить; хід None, якщо ходів немає. Незавершена ітерація відкидається
+    think_time_ms = BOT_THINK_TIME_MS if think_time_ms is None else think_time_ms
+    max_depth = BOT_MAX_SEARCH_DEPTH if max_depth is None else max_depth
+    bot_side = position.side
+    root_moves = position.legal_moves()
+    if not root_moves:
+        return None, float('-inf'), []
+
+    transposition_table.new_search()
+    # Перша ітерація завжди доводиться до кінця, далі діє бюджет часу
+    search_clock.start(None)
+    best_move, best_score, best_line = root_moves[0], float('-inf'), [root_moves[0]]
+    for depth in range(1, max_depth + 1):
+        alpha = float('-inf')
+        iteration_score, iteration_line = float('-inf'), []
+        for move in root_moves:
+            position.make_move(move)
+            score, line = minimax(position, depth - 1, False, alpha, float('inf'), bot_side)
+            position.unmake_move()
+            if search_clock.stopped:
+                break
+            if score > iteration_score or not iteration_line:
+                iteration_score, iteration_line = score, [move] + line
+            alpha = max(alpha, score)
+        if search_clock.stopped:
+            break
+
+        best_move, best_score, best_line = iteration_line[0], iteration_score, iteration_line
+        # Найкращий хід попередньої ітерації перебирається першим
+        root_moves.remove(best_move)
+        root_moves.insert(0, best_move)
+        if depth == 1:
+            search_clock.set_budget(think_time_ms)
+        # Єдиний хід не потребує пошуку, а доведений виграш чи програш глибший пошук не змінить
+        if len(root_moves) == 1 or best_score in (float('inf'), float('-inf')):
+            break
+    return best_move, best_score, best_line
+
+def engine_move_to_board(board, move):
+    # Хід рушія -> (шашка, поле призначення, збиті шашки) на дошці Board для виконання через move_piece
+    from_sq, to_sq, captures, _ = move
+    piece = board.get_piece(square_row(from_sq), square_col(from_sq))
+    skipped_pieces = [board.get_piece(square_row(sq), square_col(sq)) for sq in captures]
+    return piece, (square_row(to_sq), square_col(to_sq)), [p for p in skipped_pieces if p != 0]
+
+def legal_board_moves(board, piece):
+    # Ходи шашки, дозволені правилами для всієї сторони (обов'язкова і найдовша рубка), у форматі Board.valid_moves
+    moves = {}
+    for move in board.to_position(piece.color).legal_moves():
+        if move[0] == square(piece.row, piece.col):
+            _, destination, skipped_pieces = engine_move_to_board(board, move)
+            moves[destination] = skipped_pieces
+    return moves
 
 # --- ЛОГІКА БОТА ДЛЯ ЛЕГКОЇ СКЛАДНОСТІ ---
 def make_easy_bot_move(board, bot_color):
@@ -537,6 +577,10 @@ def make_easy_bot_move(board, bot_color):
         return None, None, []
 
     capture_moves = [m for m in all_possible_moves if m['is_capture']]
+    if capture_moves:
+        # Рубати можна лише найдовшим ланцюжком серед усіх шашок
+        longest_capture = max(len(m['skipped']) for m in capture_moves)
+        capture_moves = [m for m in capture_moves if len(m['skipped']) == longest_capture]
     
     if capture_moves:
         chosen_move_data = random.choice(capture_moves)
@@ -575,29 +619,24 @@ def make_medium_bot_move(board, bot_color):
         return None, None, []
 
     if must_capture:
-        all_possible_moves_data = [m for m in all_possible_moves_data if m['skipped_objs']]
+        longest_capture = max(len(m['skipped_objs']) for m in all_possible_moves_data)
+        all_possible_moves_data = [m for m in all_possible_moves_data if len(m['skipped_objs']) == longest_capture]
 
     for move_data in all_possible_moves_data:
         score = 0
-        temp_board = copy.deepcopy(board)
-        
-        sim_piece_to_move = temp_board.get_piece(move_data['piece_obj'].row, move_data['piece_obj'].col)
-        sim_skipped_pieces = [temp_board.get_piece(s.row, s.col) for s in move_data['skipped_objs'] if temp_board.get_piece(s.row, s.col) !=0]
-
-        if not sim_piece_to_move:
-            continue
-
-        temp_board.move_piece(sim_piece_to_move, move_data['move_pos'][0], move_data['move_pos'][1], sim_skipped_pieces)
-        piece_after_move_sim = temp_board.get_piece(move_data['move_pos'][0], move_data['move_pos'][1])
+        piece_was_king = move_data['piece_obj'].king
+        # Хід пробуємо на самій дошці й відкочуємо, щойно оцінено його наслідки
+        move_undo = board.apply_move(move_data['piece_obj'], move_data['move_pos'][0], move_data['move_pos'][1], move_data['skipped_objs'])
+        piece_after_move_sim = board.get_piece(move_data['move_pos'][0], move_data['move_pos'][1])
 
         if move_data['skipped_objs']:
             score += 1000 + len(move_data['skipped_objs']) * 100
 
-        if piece_after_move_sim and piece_after_move_sim.king and not move_data['piece_obj'].king:
+        if piece_after_move_sim and piece_after_move_sim.king and not piece_was_king:
             score += 250
         
         if piece_after_move_sim and not move_data['skipped_objs']:
-            next_turn_potential_captures = temp_board.valid_moves(piece_after_move_sim)
+            next_turn_potential_captures = board.valid_moves(piece_after_move_sim)
             if any(sk for _, sk in next_turn_potential_captures.items() if sk):
                 score += 150
 
@@ -605,15 +644,16 @@ def make_medium_bot_move(board, bot_color):
         if piece_after_move_sim:
             for r_opp in range(ROWS):
                 for c_opp in range(COLS):
-                    opp_piece_sim = temp_board.get_piece(r_opp, c_opp)
+                    opp_piece_sim = board.get_piece(r_opp, c_opp)
                     if opp_piece_sim != 0 and opp_piece_sim.color == opponent_color:
-                        opp_next_moves = temp_board.valid_moves(opp_piece_sim)
+                        opp_next_moves = board.valid_moves(opp_piece_sim)
                         for _, opp_skipped_list_sim in opp_next_moves.items():
                             if piece_after_move_sim in opp_skipped_list_sim:
                                 is_safe_from_immediate_capture = False
                                 break
                 if not is_safe_from_immediate_capture:
                     break
+        board.undo_move(move_undo)
         
         if not is_safe_from_immediate_capture:
             if not move_data['skipped_objs']:
@@ -680,65 +720,13 @@ async def bot_move(board, bot_color):
         chosen_piece_original, chosen_move_pos, skipped_pieces_original = make_medium_bot_move(board, bot_color)
 
     elif CURRENT_BOT_DIFFICULTY == DIFFICULTY_HARD:
-        depth = 5 
-        opponent_color = WHITE_PIECE if bot_color == BLACK_PIECE else BLACK_PIECE
-        
-        score, new_board_state_from_minimax = minimax(board, depth, True, float('-inf'), float('inf'), bot_color, opponent_color)
+        best_move, score, principal_variation = search_best_move(board.to_position(bot_color))
 
-        if new_board_state_from_minimax is None:
-            return make_easy_bot_move(board, bot_color)
+        if best_move is None:
+            return None, None, []
 
-        all_current_possible_moves = []
-        bot_pieces_on_current_board = [
-            p for r in range(ROWS) for c in range(COLS) 
-            if (p := board.get_piece(r,c)) !=0 and p.color == bot_color
-        ]
-        
-        for piece in bot_pieces_on_current_board:
-            current_piece_moves = board.valid_moves(piece)
-            for move_p, skipped_p in current_piece_moves.items():
-                all_current_possible_moves.append({'piece': piece, 'move_pos': move_p, 'skipped': skipped_p})
-
-        all_current_possible_moves.sort(key=lambda x: len(x['skipped']), reverse=True)
-
-        found_matching_move = False
-        for move_option in all_current_possible_moves:
-            temp_board_for_check = copy.deepcopy(board)
-            piece_to_sim_on_check = temp_board_for_check.get_piece(move_option['piece'].row, move_option['piece'].col)
-            
-            skipped_to_sim_on_check = []
-            if move_option['skipped']:
-                for sp_orig in move_option['skipped']: 
-                    sp_sim_on_check = temp_board_for_check.get_piece(sp_orig.row, sp_orig.col)
-                    if sp_sim_on_check:
-                        skipped_to_sim_on_check.append(sp_sim_on_check)
-            
-            if not piece_to_sim_on_check: continue 
-
-            temp_board_for_check.move_piece(piece_to_sim_on_check, move_option['move_pos'][0], move_option['move_pos'][1], skipped_to_sim_on_check)
-
-            boards_match = True
-            for r_comp in range(ROWS):
-                for c_comp in range(COLS):
-                    p1 = temp_board_for_check.get_piece(r_comp, c_comp)
-                    p2 = new_board_state_from_minimax.get_piece(r_comp, c_comp)
-                    
-                    if (p1 == 0 and p2 != 0) or (p1 != 0 and p2 == 0):
-                        boards_match = False; break
-                    if p1 != 0 and p2 != 0:
-                        if not (p1.row == p2.row and p1.col == p2.col and p1.color == p2.color and p1.king == p2.king):
-                            boards_match = False; break
-                if not boards_match: break
-            
-            if boards_match:
-                chosen_piece_original = move_option['piece'] 
-                chosen_move_pos = move_option['move_pos']
-                skipped_pieces_original = [board.get_piece(s.row, s.col) for s in move_option['skipped'] if board.get_piece(s.row, s.col) != 0]
-                found_matching_move = True
-                break
-        
-        if not found_matching_move:
-            return make_easy_bot_move(board, bot_color)
+        # Лише обраний хід переноситься на дошку Board
+        chosen_piece_original, chosen_move_pos, skipped_pieces_original = engine_move_to_board(board, best_move)
     
     if chosen_piece_original and chosen_move_pos:
         if board.get_piece(chosen_piece_original.row, chosen_piece_original.col) == chosen_piece_original:
@@ -1059,7 +1047,7 @@ async def main():
                                     piece_clicked = board.get_piece(row, col)
                                     if piece_clicked != 0 and piece_clicked.color == turn: 
                                         selected_piece = piece_clicked
-                                        valid_moves = board.valid_moves(selected_piece)
+                                        valid_moves = legal_board_moves(board, selected_piece)
                                     else: 
                                         selected_piece = None
                                         valid_moves = {}
@@ -1076,7 +1064,7 @@ async def main():
                                                 must_make_capture_somewhere = True; break
                                     if must_make_capture_somewhere: break
                                 
-                                current_piece_can_capture = any(sk for _, sk in board.valid_moves(piece_clicked).items() if sk)
+                                current_piece_can_capture = any(sk for _, sk in legal_board_moves(board, piece_clicked).items() if sk)
 
                                 if must_make_capture_somewhere and not current_piece_can_capture:
                                     game_logs.append("Помилка: Ви зобов'язані рубати іншою шашкою!")
@@ -1084,7 +1072,7 @@ async def main():
                                     valid_moves = {}
                                 else:
                                     selected_piece = piece_clicked
-                                    valid_moves = board.valid_moves(selected_piece)
+                                    valid_moves = legal_board_moves(board, selected_piece)
                                     if not valid_moves and must_make_capture_somewhere:
                                         game_logs.append("Помилка: Обрана шашка без ходів, але є обов'язкові рубки!")
                                         selected_piece = None
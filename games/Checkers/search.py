@@ -0,0 +1,81 @@
+import time
+
+# --- Допоміжні структури пошуку бота ---
+
+# --- Таблиця транспозицій ---
+BOUND_EXACT, BOUND_LOWER, BOUND_UPPER = 0, 1, 2
+# Тип межі після зміни погляду на оцінку (заперечення міняє нижню та верхню межі місцями)
+OPPOSITE_BOUND = (BOUND_EXACT, BOUND_UPPER, BOUND_LOWER)
+
+# Приблизний розмір одного запису в CPython: кортеж із 6 полів, кортеж ходу, 64-бітний ключ і слот списку
+TT_ENTRY_SIZE_BYTES = 240
+
+class TranspositionTable:
+    # Запис: (ключ, глибина, тип межі, оцінка з погляду сторони, що ходить, найкращий хід, покоління)
+    def __init__(self, size_mb=8):
+        self.resize(size_mb)
+
+    def resize(self, size_mb):
+        entries = max(1, int(size_mb * 1024 * 1024) // TT_ENTRY_SIZE_BYTES)
+        # Розмір — степінь двійки, щоб індекс рахувався маскою
+        size = 1
+        while size * 2 <= entries:
+            size *= 2
+        self.size = size
+        self.mask = size - 1
+        self.entries = [None] * size
+        self.generation = 0
+
+    def clear(self):
+        self.entries = [None] * self.size
+        self.generation = 0
+
+    def new_search(self):
+        self.generation += 1
+
+    def probe(self, key):
+        entry = self.entries[key & self.mask]
+        if entry is not None and entry[0] == key:
+            return entry
+        return None
+
+    def store(self, key, depth, bound, score, move):
+        index = key & self.mask
+        old = self.entries[index]
+        if old is not None:
+            if old[0] != key and old[5] == self.generation and old[1] > depth:
+                # Заміна: глибший запис поточного пошуку лишається, застарілі й мілкіші — витісняються
+                return
+            if old[0] == key and move is None:
+                move = old[4]
+        self.entries[index] = (key, depth, bound, score, move, self.generation)
+
+# --- Годинник пошуку ---
+# Час перевіряється раз на TIME_CHECK_NODES вузлів, щоб не кликати perf_counter у кожному вузлі
+TIME_CHECK_NODES = 1024
+
+class SearchClock:
+    def __init__(self):
+        self.start_time = 0.0
+        self.deadline = None
+        self.nodes = 0
+        self.stopped = False
+
+    def start(self, budget_ms):
+        self.start_time = time.perf_counter()
+        self.nodes = 0
+        self.stopped = False
+        self.set_budget(budget_ms)
+
+    def set_budget(self, budget_ms):
+        # None — без обмеження часу
+        self.deadline = None if budget_ms is None else self.start_time + budget_ms / 1000.0
+
+    def tick(self):
+        self.nodes += 1
+        if self.nodes % TIME_CHECK_NODES == 0 and self.deadline is not None and time.perf_counter() >= self.deadline:
+            self.stopped = True
+        return self.stopped
+
+    def elapsed_ms(self):
+        return (time.perf_counter() - self.start_time) * 1000.0
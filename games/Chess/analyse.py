@@ -0,0 +1,102 @@
+# --- Аналіз позицій без вікна pygame ---
+# Пакетний аналіз на сервері: один FEN на рядок, результат — рядок із полями через табуляцію
+#   python analyse.py --fen FEN [--fen FEN ...] [--time-ms 1000] [--workers 4] [--book]
+#   python analyse.py --file positions.txt
+#   cat positions.txt | python analyse.py
+#   python analyse.py --file positions.txt --json   (рядок JSON на позицію разом зі статистикою пошуку)
+#   python analyse.py --regressions                  (перевірка позицій, де пошук колись помилявся)
+import argparse
+import json
+import sys
+import time
+
+import bot
+from engine import Position, COLOR_NAMES, move_to_uci, move_to_san
+from search import format_score
+
+# --- Регресійні позиції пошуку: (назва, FEN, очікуваний хід UCI) ---
+SEARCH_REGRESSIONS = [
+    # Мат останнім ходом перед правилом 50 ходів має перевагу над нічиєю
+    ("mate_at_fifty_move_limit", "6k1/5ppp/8/8/8/8/8/R5K1 w - - 99 80", "a1a8"),
+]
+
+def analyse_position(position, think_time_ms, workers=0, use_book=False):
+    # Повертає словник із результатом аналізу; позиція після аналізу не змінюється
+    color = COLOR_NAMES[position.side]
+    start_time = time.perf_counter()
+    book_move = bot.probe_opening_book(position, color) if use_book else None
+    bot.search_stats.reset()
+    if book_move:
+        best_move, score, depth = book_move, None, 0
+    elif workers:
+        best_move, score, depth = bot.search_root_parallel(position, color, think_time_ms, workers)
+    else:
+        best_move, score, depth = bot.run_to_completion(bot.search_root(position, color, think_time_ms))
+    elapsed_ms = (time.perf_counter() - start_time) * 1000.0
+    if best_move is None:
+        # Ходів немає: мат або пат
+        score_str = "mate 0" if position.in_check() else "cp 0"
+        return {"fen": position.to_fen(), "bestmove": "-", "san": "-", "score": score_str, "depth": 0, "time_ms": elapsed_ms}
+    return {
+        "fen": position.to_fen(),
+        "bestmove": move_to_uci(best_move),
+        "san": move_to_san(position, best_move),
+        "score": "book" if score is None else format_score(score),
+        "depth": depth,
+        "time_ms": elapsed_ms,
+    }
+
+def run_regressions(think_time_ms):
+    failures = 0
+    for name, fen, expected_uci in SEARCH_REGRESSIONS:
+        bot.transposition_table.clear()
+        result = analyse_position(Position.from_fen(fen), think_time_ms)
+        status = "OK" if result["bestmove"] == expected_uci else "ПОМИЛКА"
+        if result["bestmove"] != expected_uci: failures += 1
+        print(f"{status:8} {name}: {result['bestmove']} (очікувалось {expected_uci}), {result['score']}")
+    return failures
+
+def read_fens(args):
+    if args.fen:
+        return list(args.fen)
+    source = open(args.file, encoding="utf-8") if args.file else sys.stdin
+    with source:
+        return [line.strip() for line in source if line.strip() and not line.startswith("#")]
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Аналіз шахових позицій без графічного інтерфейсу")
+    parser.add_argument("--fen", action="append", help="FEN позиції (можна кілька разів)")
+    parser.add_argument("--file", help="файл з FEN, по одному на рядок")
+    parser.add_argument("--time-ms", type=int, default=bot.BOT_THINK_TIME_MS, help="час на позицію, мс")
+    parser.add_argument("--workers", type=int, default=0, help="кількість процесів (0 — один процес)")
+    parser.add_argument("--book", action="store_true", help="брати ходи з дебютної книги")
+    parser.add_argument("--json", action="store_true", help="виводити рядки JSON зі статистикою пошуку")
+    parser.add_argument("--regressions", action="store_true", help="перевірити регресійні позиції пошуку")
+    args = parser.parse_args(argv)
+
+    if args.regressions:
+        return 1 if run_regressions(args.time_ms) else 0
+
+    failures = 0
+    try:
+        for fen in read_fens(args):
+            try:
+                position = Position.from_fen(fen)
+            except ValueError as error:
+                print(error, file=sys.stderr)
+                failures += 1
+                continue
+            result = analyse_position(position, args.time_ms, args.workers, args.book)
+            if args.json:
+                result["time_ms"] = round(result["time_ms"], 1)
+                result["stats"] = bot.search_stats.as_dict()
+                print(json.dumps(result, ensure_ascii=False), flush=True)
+                continue
+            print("\t".join((result["fen"], result["bestmove"], result["san"], result["score"],
+                             str(result["depth"]), f"{result['time_ms']:.0f}")), flush=True)
+    finally:
+        bot.shutdown_parallel_executor()
+    return 1 if failures else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,159 @@
+# --- Дебютна книга ---
+# Файл opening_book.bin — відсортовані за ключем записи по 12 байт (як у Polyglot): ключ Zobrist позиції,
+# хід без прапорця (from | to << 6 | promo << 12) і вага. Пошук — бінарний (bisect) прямо по байтах файлу.
+# Ключі — це Position.hash, тож після зміни ключів Zobrist у engine.py книгу треба перебудувати:
+#   python book.py build
+#   python book.py probe [--fen FEN]
+import argparse
+import bisect
+import os
+import random
+import struct
+import sys
+
+from engine import Position, START_FEN, initial_position, move_to_uci
+
+BOOK_ENTRY = struct.Struct(">QHH")
+BOOK_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "opening_book.bin")
+BOOK_MOVE_MASK = 0x7FFF
+BOOK_MAX_WEIGHT = 0xFFFF
+
+# --- Дебютні лінії для побудови книги (UCI); вага ходу — кількість ліній, що його містять ---
+BOOK_LINES = [
+    # Відкриті дебюти
+    "e2e4 e7e5 g1f3 b8c6 f1b5 a7a6 b5a4 g8f6 e1g1 f8e7 f1e1 b7b5 a4b3 d7d6 c2c3 e8g8",
+    "e2e4 e7e5 g1f3 b8c6 f1b5 g8f6 e1g1 f6e4 d2d4 e4d6 b5c6 d7c6 d4e5 d6f5",
+    "e2e4 e7e5 g1f3 b8c6 f1c4 f8c5 c2c3 g8f6 d2d3 d7d6 e1g1 e8g8",
+    "e2e4 e7e5 g1f3 b8c6 f1c4 g8f6 d2d3 f8e7 e1g1 e8g8 f1e1 d7d6",
+    "e2e4 e7e5 g1f3 b8c6 d2d4 e5d4 f3d4 g8f6 d4c6 b7c6 e4e5 d8e7",
+    "e2e4 e7e5 g1f3 g8f6 f3e5 d7d6 e5f3 f6e4 d2d4 d6d5 f1d3",
+    "e2e4 e7e5 b1c3 g8f6 g1f3 b8c6 d2d4 e5d4 f3d4 f8b4",
+    # Сицилійський захист
+    "e2e4 c7c5 g1f3 d7d6 d2d4 c5d4 f3d4 g8f6 b1c3 a7a6 c1e3 e7e5 d4b3",
+    "e2e4 c7c5 g1f3 b8c6 d2d4 c5d4 f3d4 g8f6 b1c3 d7d6 c1g5 e7e6",
+    "e2e4 c7c5 g1f3 e7e6 d2d4 c5d4 f3d4 b8c6 b1c3 d8c7 c1e3 a7a6",
+    "e2e4 c7c5 c2c3 g8f6 e4e5 f6d5 d2d4 c5d4 g1f3 b8c6",
+    # Напіввідкриті дебюти
+    "e2e4 e7e6 d2d4 d7d5 b1c3 g8f6 c1g5 f8e7 e4e5 f6d7 g5e7 d8e7",
+    "e2e4 e7e6 d2d4 d7d5 e4e5 c7c5 c2c3 b8c6 g1f3 d8b6",
+    "e2e4 c7c6 d2d4 d7d5 b1c3 d5e4 c3e4 c8f5 e4g3 f5g6 h2h4 h7h6",
+    "e2e4 c7c6 d2d4 d7d5 e4e5 c8f5 g1f3 e7e6 f1e2 c6c5",
+    "e2e4 d7d5 e4d5 d8d5 b1c3 d5a5 d2d4 g8f6 g1f3 c8f5",
+    "e2e4 d7d6 d2d4 g8f6 b1c3 g7g6 g1f3 f8g7 f1e2 e8g8 e1g1",
+    # Закриті дебюти
+    "d2d4 d7d5 c2c4 e7e6 b1c3 g8f6 c1g5 f8e7 e2e3 e8g8 g1f3 h7h6",
+    "d2d4 d7d5 c2c4 d5c4 g1f3 g8f6 e2e3 e7e6 f1c4 c7c5 e1g1 a7a6",
+    "d2d4 d7d5 c2c4 c7c6 g1f3 g8f6 b1c3 d5c4 a2a4 c8f5 e2e3 e7e6",
+    "d2d4 d7d5 c1f4 g8f6 e2e3 e7e6 g1f3 c7c5 c2c3 b8c6",
+    "d2d4 g8f6 c2c4 g7g6 b1c3 f8g7 e2e4 d7d6 g1f3 e8g8 f1e2 e7e5 e1g1 b8c6",
+    "d2d4 g8f6 c2c4 e7e6 b1c3 f8b4 e2e3 e8g8 f1d3 d7d5 g1f3 c7c5 e1g1",
+    "d2d4 g8f6 c2c4 e7e6 g1f3 b7b6 g2g3 c8b7 f1g2 f8e7 e1g1 e8g8",
+    "d2d4 g8f6 c2c4 g7g6 b1c3 d7d5 c4d5 f6d5 e2e4 d5c3 b2c3 f8g7",
+    "d2d4 g8f6 c2c4 e7e6 g2g3 d7d5 f1g2 f8e7 g1f3 e8g8 e1g1 d5c4",
+    "d2d4 f7f5 g2g3 g8f6 f1g2 e7e6 g1f3 f8e7 e1g1 e8g8 c2c4",
+    # Фланкові дебюти
+    "c2c4 e7e5 b1c3 g8f6 g1f3 b8c6 g2g3 d7d5 c4d5 f6d5",
+    "c2c4 c7c5 g1f3 g8f6 b1c3 b8c6 g2g3 g7g6 f1g2 f8g7",
+    "g1f3 d7d5 g2g3 g8f6 f1g2 e7e6 e1g1 f8e7 d2d3 e8g8",
+    "g1f3 g8f6 c2c4 g7g6 b1c3 f8g7 e2e4 d7d6 d2d4 e8g8 f1e2 e7e5",
+]
+
+class _BookKeys:
+    # Послідовність ключів поверх байтів файлу — bisect шукає по ній без розпакування всієї книги
+    def __init__(self, data):
+        self.data = data
+
+    def __len__(self):
+        return len(self.data) // BOOK_ENTRY.size
+
+    def __getitem__(self, index):
+        return BOOK_ENTRY.unpack_from(self.data, index * BOOK_ENTRY.size)[0]
+
+class OpeningBook:
+    def __init__(self, data=b""):
+        self.data = data
+        self.keys = _BookKeys(data)
+
+    @classmethod
+    def load(cls, path=BOOK_PATH):
+        # Без файлу книга просто порожня — боти рахують усі ходи самі
+        try:
+            with open(path, "rb") as book_file:
+                return cls(book_file.read())
+        except OSError:
+            return cls()
+
+    def __len__(self):
+        return len(self.keys)
+
+    def entries(self, key):
+        entries = []
+        index = bisect.bisect_left(self.keys, key)
+        while index < len(self.keys):
+            entry_key, move, weight = BOOK_ENTRY.unpack_from(self.data, index * BOOK_ENTRY.size)
+            if entry_key != key: break
+            entries.append((move, weight))
+            index += 1
+        return entries
+
+    def moves(self, position):
+        # Ходи книги для позиції у повному кодуванні рушія (з прапорцями), лише легальні
+        entries = self.entries(position.hash)
+        if not entries: return []
+        legal = {move & BOOK_MOVE_MASK: move for move in position.legal_moves()}
+        return [(legal[move], weight) for move, weight in entries if move in legal]
+
+    def choose(self, position, rng=random):
+        moves = self.moves(position)
+        if not moves: return None
+        return rng.choices([move for move, _ in moves], weights=[weight for _, weight in moves])[0]
+
+def find_uci_move(position, uci):
+    for move in position.legal_moves():
+        if move_to_uci(move) == uci:
+            return move
+    return None
+
+def build_book(lines=BOOK_LINES):
+    weights = {}
+    for line in lines:
+        position = initial_position()
+        for uci in line.split():
+            move = find_uci_move(position, uci)
+            if move is None:
+                raise ValueError(f"Нелегальний хід '{uci}' у лінії книги: {line}")
+            entry = (position.hash, move & BOOK_MOVE_MASK)
+            weights[entry] = weights.get(entry, 0) + 1
+            position.make_move(move)
+    return b"".join(
+        BOOK_ENTRY.pack(key, move, min(weight, BOOK_MAX_WEIGHT))
+        for (key, move), weight in sorted(weights.items())
+    )
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Побудова та перевірка дебютної книги")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    build_parser = subparsers.add_parser("build")
+    build_parser.add_argument("--output", default=BOOK_PATH)
+    probe_parser = subparsers.add_parser("probe")
+    probe_parser.add_argument("--fen", default=START_FEN)
+    probe_parser.add_argument("--book", default=BOOK_PATH)
+    args = parser.parse_args(argv)
+
+    if args.command == "build":
+        data = build_book()
+        with open(args.output, "wb") as book_file:
+            book_file.write(data)
+        print(f"Записів: {len(data) // BOOK_ENTRY.size}, розмір: {len(data)} байт -> {args.output}")
+        return 0
+    if args.command == "probe":
+        book = OpeningBook.load(args.book)
+        moves = book.moves(Position.from_fen(args.fen))
+        if not moves:
+            print("Позиції немає в книзі")
+        for move, weight in sorted(moves, key=lambda entry: -entry[1]):
+            print(f"{move_to_uci(move)}: {weight}")
+        return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
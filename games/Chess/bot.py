@@ -0,0 +1,481 @@
+# --- Боти для шахів: оцінка та пошук ходу без залежності від pygame ---
+# Модуль імпортується і з main.py, і з окремих процесів (паралельний пошук, аналіз без вікна)
+import json
+import os
+import random
+import sys
+
+from engine import Position, COLOR_NAMES, COLOR_INDEX, PIECE_VALUES, MATERIAL_MG, EMPTY, PAWN, FLAG_EN_PASSANT, move_from, move_to, move_promo, move_flag, move_to_uci
+from book import OpeningBook
+from tablebase import Tablebases
+from search import (
+    TranspositionTable, MoveOrderer, SearchClock, SearchTimeout, SearchStats, run_to_completion, score_to_tt, score_from_tt,
+    principal_variation,
+    BOUND_EXACT, BOUND_LOWER, BOUND_UPPER, MATE_SCORE, MATE_BOUND, INFINITE_SCORE, MAX_SEARCH_PLY,
+)
+
+# --- Логіка бота ---
+BOT_TT_SIZE_MB = 8
+BOT_THINK_TIME_MS = 1000
+BOT_MAX_SEARCH_DEPTH = 32
+# Скільки мілісекунд пошук працює, перш ніж віддати керування циклу кадрів (pygbag не має потоків)
+BOT_FRAME_SLICE_MS = 15
+QUIESCENCE_DELTA_MARGIN = 200
+QUIESCENCE_MAX_PLY = 64
+# Прийоми відсікання (вмикаються окремо, щоб порівнювати їхній внесок за статистикою search_stats)
+SEARCH_USE_PVS = True
+SEARCH_USE_NULL_MOVE = True
+SEARCH_USE_LMR = True
+SEARCH_USE_ASPIRATION = True
+NULL_MOVE_REDUCTION = 2
+NULL_MOVE_MIN_DEPTH = 3
+LMR_MIN_DEPTH = 3
+LMR_MIN_MOVE_INDEX = 3
+LMR_DEEP_MOVE_INDEX = 8
+LMR_DEEP_MIN_DEPTH = 5
+ASPIRATION_MIN_DEPTH = 4
+ASPIRATION_WINDOW = 50
+# Кількість процесів для паралельного пошуку важкого бота: 0 — однопотоковий пошук
+BOT_PARALLEL_WORKERS = 0
+# Під pygbag (emscripten) немає ні процесів, ні потоків
+PARALLEL_SEARCH_AVAILABLE = sys.platform != "emscripten"
+if PARALLEL_SEARCH_AVAILABLE:
+    try:
+        from concurrent.futures import ProcessPoolExecutor
+    except ImportError:
+        PARALLEL_SEARCH_AVAILABLE = False
+parallel_executor = None
+parallel_executor_workers = 0
+transposition_table = TranspositionTable(BOT_TT_SIZE_MB)
+move_orderer = MoveOrderer()
+search_stats = SearchStats()
+# Дебютна книга для середнього та важкого ботів (файл opening_book.bin поруч із модулем)
+BOT_USE_OPENING_BOOK = True
+opening_book = None
+# Ендшпільні таблиці KQK, KRK, KPK (каталог tablebases поруч із модулем) — для кореня й усередині пошуку
+BOT_USE_TABLEBASES = True
+# Більше фігур на дошці — таблиці навіть не перевіряємо (підрахунок порожніх полів — один виклик list.count)
+TABLEBASE_MAX_PIECES = 3
+tablebases = None
+search_clock = SearchClock()
+# Обдумування на час суперника: після свого ходу важкий бот рахує позицію після очікуваної відповіді
+BOT_PONDER = True
+ponder_active = False
+# Якщо задано шлях, кожен пошук важкого бота дописує у файл рядок JSON зі статистикою (для аналізу партій без вікна)
+SEARCH_LOG_PATH = None
+
+def evaluate_board_state_minimax(position_mm_eval, player_color_mm_eval):
+    # Матеріал і позиції фігур ведуться в Position інкрементально, тож оцінка листа — O(1)
+    score_mm_eval = position_mm_eval.evaluate()
+    return score_mm_eval if COLOR_INDEX[player_color_mm_eval] == position_mm_eval.side else -score_mm_eval
+
+def evaluate_move_medium(position_mb, bot_color_eval_mb, move_mb):
+    score_mb = 0
+    opponent_index_mb = COLOR_INDEX[bot_color_eval_mb] ^ 1
+    start_sq_mb, end_sq_mb = move_from(move_mb), move_to(move_mb)
+    original_captured_piece_mb = position_mb.board[end_sq_mb]
+    if move_flag(move_mb) == FLAG_EN_PASSANT: original_captured_piece_mb = PAWN
+    start_was_attacked_mb = position_mb.is_square_attacked(start_sq_mb, opponent_index_mb)
+    position_mb.make_move(move_mb)
+    moved_piece_mb = position_mb.board[end_sq_mb]
+    if position_mb.in_check(opponent_index_mb): score_mb += 50
+    if original_captured_piece_mb: score_mb += PIECE_VALUES[original_captured_piece_mb & 7]
+    end_is_attacked_mb = position_mb.is_square_attacked(end_sq_mb, opponent_index_mb)
+    if end_is_attacked_mb:
+        score_mb -= PIECE_VALUES[moved_piece_mb & 7] * 0.5
+    if start_was_attacked_mb and not end_is_attacked_mb:
+        score_mb += PIECE_VALUES[moved_piece_mb & 7] * 0.8
+    position_mb.unmake_move()
+    score_mb += random.uniform(-1, 1)
+    return score_mb
+
+def probe_opening_book(position_ob, color_of_bot_ob):
+    # Книга завантажується при першому зверненні; без файлу книги повертає None
+    global opening_book
+    if not BOT_USE_OPENING_BOOK or position_ob.side != COLOR_INDEX[color_of_bot_ob]: return None
+    if opening_book is None: opening_book = OpeningBook.load()
+    return opening_book.choose(position_ob)
+
+def get_tablebases():
+    # Таблиці завантажуються при першому зверненні
+    global tablebases
+    if tablebases is None: tablebases = Tablebases.load()
+    return tablebases
+
+def probe_tablebase_move(position_tb, color_of_bot_tb):
+    if not BOT_USE_TABLEBASES or position_tb.side != COLOR_INDEX[color_of_bot_tb]: return None
+    if 64 - position_tb.board.count(EMPTY) > TABLEBASE_MAX_PIECES: return None
+    return get_tablebases().best_move(position_tb)
+
+def tablebase_score(position_tb, ply_tb):
+    # Точна оцінка з таблиць з погляду сторони, що ходить (мат рахується від кореня, як і в пошуку), або None
+    if not BOT_USE_TABLEBASES or 64 - position_tb.board.count(EMPTY) > TABLEBASE_MAX_PIECES: return None
+    probed_tb = get_tablebases().probe(position_tb)
+    if probed_tb is None: return None
+    result_tb, plies_tb = probed_tb
+    if result_tb > 0: return MATE_SCORE - plies_tb - ply_tb
+    if result_tb < 0: return -MATE_SCORE + plies_tb + ply_tb
+    return 0
+
+def get_all_valid_moves_for_bot(current_position_bot, color_of_bot_param):
+    if current_position_bot.side != COLOR_INDEX[color_of_bot_param]:
+        current_position_bot = current_position_bot.copy()
+        current_position_bot.side = COLOR_INDEX[color_of_bot_param]
+        current_position_bot.ep_square = -1
+    return current_position_bot.legal_moves()
+
+def check_game_over_conditions_for_board(position_cgofb, player_to_check_color_cgofb):
+    if position_cgofb.side != COLOR_INDEX[player_to_check_color_cgofb]:
+        return not get_all_valid_moves_for_bot(position_cgofb, player_to_check_color_cgofb)
+    # Для мату чи пату досить знати, чи є хоч один легальний хід
+    return not position_cgofb.has_any_legal_move()
+
+def choose_easy_bot_move(current_position_eb, color_of_bot_eb):
+    all_moves_eb = get_all_valid_moves_for_bot(current_position_eb, color_of_bot_eb)
+    if not all_moves_eb:
+        return None
+    capture_moves = [move for move in all_moves_eb if current_position_eb.is_capture(move)]
+    if capture_moves:
+        return random.choice(capture_moves)
+    else:
+        return random.choice(all_moves_eb)
+
+def choose_medium_bot_move(current_position_mb, color_of_bot_mb):
+    book_move_mb = probe_opening_book(current_position_mb, color_of_bot_mb)
+    if book_move_mb: return book_move_mb
+    all_moves_mb = get_all_valid_moves_for_bot(current_position_mb, color_of_bot_mb)
+    if not all_moves_mb: return None
+    best_score_mb = -float('inf')
+    best_moves_list_mb = []
+    for move_mb in all_moves_mb:
+        current_score_mb = evaluate_move_medium(current_position_mb, color_of_bot_mb, move_mb)
+        if current_score_mb > best_score_mb:
+            best_score_mb = current_score_mb
+            best_moves_list_mb = [move_mb]
+        elif current_score_mb == best_score_mb:
+            best_moves_list_mb.append(move_mb)
+    return random.choice(best_moves_list_mb) if best_moves_list_mb else None
+
+def negamax(position_ng, depth_ng, alpha_ng, beta_ng, ply_ng, allow_null_ng=True):
+    # Negamax із пошуком головної варіації: оцінка з погляду сторони, що ходить, ply_ng — відстань від кореня
+    search_clock.tick()
+    if search_clock.yield_due:
+        # Віддаємо керування циклу кадрів; пошук продовжиться з цього ж вузла
+        yield
+        search_clock.resume()
+    # Повторення вже пройденої позиції (у партії чи в цій гілці) — нічия, цикли далі не рахуємо
+    if position_ng.repetition_count() >= 2:
+        return 0
+    # Правило 50 ходів: нічия, лише якщо останній хід не дав мат (мат має перевагу)
+    if position_ng.is_fifty_move_draw():
+        if position_ng.has_any_legal_move(): return 0
+        return -MATE_SCORE + ply_ng if position_ng.in_check() else 0
+    tablebase_score_ng = tablebase_score(position_ng, ply_ng)
+    if tablebase_score_ng is not None:
+        search_stats.tablebase_hits += 1
+        return tablebase_score_ng
+    if depth_ng <= 0:
+        # На горизонті доводимо до кінця розмін взяттями замість статичної оцінки
+        return (yield from quiescence(position_ng, alpha_ng, beta_ng, ply_ng))
+    search_stats.nodes += 1
+    key_ng = position_ng.hash
+    is_pv_node_ng = beta_ng - alpha_ng > 1
+    tt_move_ng = 0
+    tt_entry_ng = transposition_table.probe(key_ng)
+    search_stats.tt_probes += 1
+    if tt_entry_ng:
+        search_stats.tt_hits += 1
+        tt_move_ng = tt_entry_ng[4]
+        # У вузлах головної варіації не обриваємо пошук за таблицею, щоб не втратити саму варіацію
+        if tt_entry_ng[1] >= depth_ng and not is_pv_node_ng:
+            tt_score_ng = score_from_tt(tt_entry_ng[3], ply_ng)
+            tt_bound_ng = tt_entry_ng[2]
+            if tt_bound_ng == BOUND_EXACT or \
+               (tt_bound_ng == BOUND_LOWER and tt_score_ng >= beta_ng) or \
+               (tt_bound_ng == BOUND_UPPER and tt_score_ng <= alpha_ng):
+                search_stats.tt_cutoffs += 1
+                return tt_score_ng
+    side_color_ng = COLOR_NAMES[position_ng.side]
+    in_check_ng = position_ng.in_check()
+
+    # Нуль-хід: якщо навіть після пропуску ходу суперник не дотягує до beta, вузол можна відсікти.
+    # Не застосовується під шахом, у вузлах головної варіації та без фігур (цугцванг у пішакових ендшпілях)
+    if SEARCH_USE_NULL_MOVE and allow_null_ng and not is_pv_node_ng and not in_check_ng and \
+       depth_ng >= NULL_MOVE_MIN_DEPTH and abs(beta_ng) < MATE_BOUND and \
+       position_ng.evaluate() >= beta_ng and position_ng.has_non_pawn_material(position_ng.side):
+        search_stats.null_move_tries += 1
+        position_ng.make_null_move()
+        null_score_ng = -(yield from negamax(position_ng, depth_ng - 1 - NULL_MOVE_REDUCTION, -beta_ng, -beta_ng + 1, ply_ng + 1, False))
+        position_ng.unmake_move()
+        if null_score_ng >= beta_ng:
+            search_stats.null_move_cutoffs += 1
+            return beta_ng
+
+    # Один список ходів на вузол: він же показує, чи це мат або пат
+    possible_next_moves_ng = get_all_valid_moves_for_bot(position_ng, side_color_ng)
+    if not possible_next_moves_ng:
+        # Мат — програш сторони, що ходить (ближчий мат гірший), пат — нічия
+        score_ng = -MATE_SCORE + ply_ng if in_check_ng else 0
+        transposition_table.store(key_ng, depth_ng, BOUND_EXACT, score_to_tt(score_ng, ply_ng), 0)
+        return score_ng
+    move_orderer.order(position_ng, possible_next_moves_ng, tt_move_ng, ply_ng)
+    killers_ng = move_orderer.killers[min(ply_ng, MAX_SEARCH_PLY - 1)]
+    alpha_orig_ng = alpha_ng
+    best_score_ng = -INFINITE_SCORE
+    best_move_ng = 0
+    for index_ng, move_ng in enumerate(possible_next_moves_ng):
+        is_quiet_ng = not position_ng.is_capture(move_ng) and not move_promo(move_ng)
+        position_ng.make_move(move_ng)
+        new_depth_ng = depth_ng - 1
+        if index_ng == 0:
+            score_ng = -(yield from negamax(position_ng, new_depth_ng, -beta_ng, -alpha_ng, ply_ng + 1))
+        else:
+            # Пізні тихі ходи спершу досліджуються на меншу глибину
+            reduction_ng = 0
+            if SEARCH_USE_LMR and depth_ng >= LMR_MIN_DEPTH and index_ng >= LMR_MIN_MOVE_INDEX and is_quiet_ng and \
+               not in_check_ng and move_ng not in killers_ng and not position_ng.in_check():
+                reduction_ng = 2 if index_ng >= LMR_DEEP_MOVE_INDEX and depth_ng >= LMR_DEEP_MIN_DEPTH else 1
+                search_stats.lmr_reductions += 1
+            # PVS: решта ходів перевіряються нульовим вікном — чи вони не кращі за вже знайдений
+            window_alpha_ng = -alpha_ng - 1 if SEARCH_USE_PVS else -beta_ng
+            score_ng = -(yield from negamax(position_ng, new_depth_ng - reduction_ng, window_alpha_ng, -alpha_ng, ply_ng + 1))
+            if reduction_ng and score_ng > alpha_ng:
+                search_stats.lmr_researches += 1
+                score_ng = -(yield from negamax(position_ng, new_depth_ng, window_alpha_ng, -alpha_ng, ply_ng + 1))
+            if SEARCH_USE_PVS and alpha_ng < score_ng < beta_ng:
+                search_stats.pvs_researches += 1
+                score_ng = -(yield from negamax(position_ng, new_depth_ng, -beta_ng, -alpha_ng, ply_ng + 1))
+        position_ng.unmake_move()
+        if score_ng > best_score_ng:
+            best_score_ng = score_ng
+            best_move_ng = move_ng
+        if score_ng > alpha_ng:
+            alpha_ng = score_ng
+        if alpha_ng >= beta_ng:
+            move_orderer.record_cutoff(position_ng, move_ng, depth_ng, ply_ng)
+            break
+    if best_score_ng <= alpha_orig_ng: bound_ng = BOUND_UPPER
+    elif best_score_ng >= beta_ng: bound_ng = BOUND_LOWER
+    else: bound_ng = BOUND_EXACT
+    transposition_table.store(key_ng, depth_ng, bound_ng, score_to_tt(best_score_ng, ply_ng), best_move_ng)
+    return best_score_ng
+
+def quiescence(position_q, alpha_q, beta_q, ply_q):
+    # Negamax: оцінка з погляду сторони, що ходить
+    search_clock.tick()
+    if search_clock.yield_due:
+        yield
+        search_clock.resume()
+    search_stats.qnodes += 1
+    in_check_q = position_q.in_check()
+    if in_check_q:
+        # Під шахом стояти на місці не можна — перебираємо всі відповіді
+        stand_pat_q = -INFINITE_SCORE
+        moves_q = position_q.legal_moves()
+        if not moves_q: return -MATE_SCORE + ply_q
+    else:
+        stand_pat_q = evaluate_board_state_minimax(position_q, COLOR_NAMES[position_q.side])
+        if stand_pat_q >= beta_q: return beta_q
+        if ply_q >= QUIESCENCE_MAX_PLY: return stand_pat_q
+        alpha_q = max(alpha_q, stand_pat_q)
+        moves_q = position_q.legal_moves(captures_only=True)
+    move_orderer.order(position_q, moves_q, 0, ply_q)
+    for move_q in moves_q:
+        if not in_check_q:
+            # Дельта-відсікання: навіть взяття з запасом не піднімає оцінку до alpha
+            captured_q = position_q.board[move_to(move_q)] & 7 or (PAWN if move_flag(move_q) == FLAG_EN_PASSANT else 0)
+            gain_q = MATERIAL_MG[captured_q] + (MATERIAL_MG[move_promo(move_q)] - MATERIAL_MG[PAWN] if move_promo(move_q) else 0)
+            if stand_pat_q + gain_q + QUIESCENCE_DELTA_MARGIN <= alpha_q: continue
+        position_q.make_move(move_q)
+        score_q = -(yield from quiescence(position_q, -beta_q, -alpha_q, ply_q + 1))
+        position_q.unmake_move()
+        if score_q >= beta_q: return beta_q
+        alpha_q = max(alpha_q, score_q)
+    return alpha_q
+
+def choose_hard_bot_move(current_position_hb, color_of_bot_hb, think_time_ms_hb=None):
+    if BOT_PARALLEL_WORKERS and PARALLEL_SEARCH_AVAILABLE:
+        return choose_hard_bot_move_parallel(current_position_hb, color_of_bot_hb, think_time_ms_hb)
+    return run_to_completion(search_hard_bot_move(current_position_hb, color_of_bot_hb, think_time_ms_hb))
+
+def search_hard_bot_move(current_position_hb, color_of_bot_hb, think_time_ms_hb=None, slice_ms_hb=None):
+    # Генератор: з slice_ms_hb віддає керування кожні slice_ms_hb мс, результат — у StopIteration.value
+    book_move_hb = probe_opening_book(current_position_hb, color_of_bot_hb)
+    if book_move_hb: return book_move_hb
+    tablebase_move_hb = probe_tablebase_move(current_position_hb, color_of_bot_hb)
+    if tablebase_move_hb: return tablebase_move_hb
+    best_move_hb, _, _ = yield from search_root(current_position_hb, color_of_bot_hb, think_time_ms_hb, slice_ms_hb)
+    return best_move_hb
+
+def search_root(current_position_hb, color_of_bot_hb, think_time_ms_hb=None, slice_ms_hb=None, root_moves_hb=None):
+    # Ітеративне поглиблення; повертає (найкращий хід, його оцінка, остання завершена глибина).
+    # root_moves_hb обмежує пошук частиною ходів кореня (для паралельного розподілу між процесами)
+    global search_clock
+    all_moves_hb = get_all_valid_moves_for_bot(current_position_hb, color_of_bot_hb)
+    if root_moves_hb is not None:
+        all_moves_hb = [move_hb for move_hb in all_moves_hb if move_hb in root_moves_hb]
+    if not all_moves_hb: return None, -INFINITE_SCORE, 0
+    if think_time_ms_hb is None: think_time_ms_hb = BOT_THINK_TIME_MS
+    # Перемішуємо, щоб серед рівноцінних ходів бот не грав завжди однаково
+    random.shuffle(all_moves_hb)
+    transposition_table.new_search()
+    move_orderer.new_search()
+    search_stats.reset()
+    # Сортування стабільне, тож рівноцінні ходи лишаються у випадковому порядку
+    move_orderer.order(current_position_hb, all_moves_hb)
+    # Під час обдумування бюджету немає — його задасть ponderhit, коли суперник зіграє очікуваний хід
+    search_clock = SearchClock(None if ponder_active else think_time_ms_hb, slice_ms_hb)
+    root_ply_hb = len(current_position_hb.undo_stack)
+    best_move_hb = all_moves_hb[0]
+    best_eval_hb, completed_depth_hb = -INFINITE_SCORE, 0
+    for search_depth_hb in range(1, BOT_MAX_SEARCH_DEPTH + 1):
+        # Перша ітерація завжди доводиться до кінця, щоб мати хід навіть при дуже малому бюджеті
+        search_clock.enabled = search_depth_hb > 1
+        # Головна варіація попередньої ітерації досліджується першою
+        all_moves_hb.remove(best_move_hb)
+        all_moves_hb.insert(0, best_move_hb)
+        # Вікно аспірації: шукаємо поблизу оцінки попередньої ітерації, а при виході за межі розширюємо
+        if SEARCH_USE_ASPIRATION and search_depth_hb >= ASPIRATION_MIN_DEPTH and abs(best_eval_hb) < MATE_BOUND:
+            alpha_hb, beta_hb = best_eval_hb - ASPIRATION_WINDOW, best_eval_hb + ASPIRATION_WINDOW
+        else:
+            alpha_hb, beta_hb = -INFINITE_SCORE, INFINITE_SCORE
+        try:
+            while True:
+                iteration_best_move_hb, iteration_eval_hb = yield from search_root_moves(current_position_hb, all_moves_hb, search_depth_hb, alpha_hb, beta_hb)
+                if iteration_eval_hb <= alpha_hb and alpha_hb > -INFINITE_SCORE:
+                    alpha_hb = -INFINITE_SCORE
+                elif iteration_eval_hb >= beta_hb and beta_hb < INFINITE_SCORE:
+                    beta_hb = INFINITE_SCORE
+                else:
+                    break
+                search_stats.aspiration_researches += 1
+        except SearchTimeout:
+            # Переривання могло статися глибоко в дереві — відкочуємо всі незавершені ходи
+            current_position_hb.unmake_to(root_ply_hb)
+            break
+        best_move_hb = iteration_best_move_hb
+        best_eval_hb, completed_depth_hb = iteration_eval_hb, search_depth_hb
+        # Оцінка кореня за неповним списком ходів не є точною, тому в таблицю її не записуємо
+        if root_moves_hb is None:
+            transposition_table.store(current_position_hb.hash, search_depth_hb, BOUND_EXACT, best_eval_hb, best_move_hb)
+            pv_hb = principal_variation(current_position_hb, transposition_table) or [best_move_hb]
+        else:
+            pv_hb = [best_move_hb]
+        search_stats.record_iteration(search_depth_hb, best_eval_hb, search_clock.elapsed_ms(), [move_to_uci(move_hb) for move_hb in pv_hb])
+        # Знайдений мат глибшим пошуком не покращиться
+        if abs(best_eval_hb) >= MATE_BOUND and MATE_SCORE - abs(best_eval_hb) <= search_depth_hb: break
+        # Наступна ітерація триває в кілька разів довше, тому не починаємо її, якщо бюджет майже вичерпано
+        if search_clock.out_of_time(0.5): break
+    search_stats.time_ms = search_clock.elapsed_ms()
+    # Процеси паралельного пошуку бачать лише частину кореня — журнал пише батьківський процес
+    if SEARCH_LOG_PATH and root_moves_hb is None:
+        write_search_log(current_position_hb, best_move_hb)
+    return best_move_hb, best_eval_hb, completed_depth_hb
+
+def write_search_log(position_log, best_move_log):
+    record_log = {"fen": position_log.to_fen(), "bestmove": move_to_uci(best_move_log)}
+    record_log.update(search_stats.as_dict())
+    with open(SEARCH_LOG_PATH, "a", encoding="utf-8") as log_file:
+        log_file.write(json.dumps(record_log, ensure_ascii=False) + "\n")
+
+def start_pondering(position_pd, color_of_bot_pd, slice_ms_pd=None):
+    # position_pd — позиція після ходу бота; повертає (очікуваний хід суперника, генератор пошуку) або (0, None)
+    global ponder_active
+    predicted_pd = principal_variation(position_pd, transposition_table, 1)
+    if not predicted_pd: return 0, None
+    ponder_position_pd = position_pd.copy()
+    ponder_position_pd.make_move(predicted_pd[0])
+    if not ponder_position_pd.has_any_legal_move(): return 0, None
+    ponder_active = True
+    return predicted_pd[0], search_hard_bot_move(ponder_position_pd, color_of_bot_pd, slice_ms_hb=slice_ms_pd)
+
+def ponderhit(think_time_ms_pd=None):
+    # Суперник зіграв очікуваний хід: обдумування стає звичайним пошуком, час рахується від його початку,
+    # тож якщо суперник думав довше за бюджет, наступна перевірка годинника одразу завершить пошук
+    global ponder_active
+    ponder_active = False
+    search_clock.set_budget(BOT_THINK_TIME_MS if think_time_ms_pd is None else think_time_ms_pd)
+
+def stop_pondering():
+    global ponder_active
+    ponder_active = False
+
+def search_root_moves(position_rm, moves_rm, depth_rm, alpha_rm, beta_rm):
+    best_move_rm, best_score_rm = moves_rm[0], -INFINITE_SCORE
+    for index_rm, move_rm in enumerate(moves_rm):
+        position_rm.make_move(move_rm)
+        if index_rm == 0 or not SEARCH_USE_PVS:
+            score_rm = -(yield from negamax(position_rm, depth_rm - 1, -beta_rm, -alpha_rm, 1))
+        else:
+            score_rm = -(yield from negamax(position_rm, depth_rm - 1, -alpha_rm - 1, -alpha_rm, 1))
+            if alpha_rm < score_rm < beta_rm:
+                search_stats.pvs_researches += 1
+                score_rm = -(yield from negamax(position_rm, depth_rm - 1, -beta_rm, -alpha_rm, 1))
+        position_rm.unmake_move()
+        if score_rm > best_score_rm:
+            best_score_rm, best_move_rm = score_rm, move_rm
+        if score_rm > alpha_rm:
+            alpha_rm = score_rm
+            if alpha_rm >= beta_rm: break
+    return best_move_rm, best_score_rm
+
+# --- Паралельний пошук у десктопному режимі ---
+# Ходи кореня розподіляються між процесами ProcessPoolExecutor; кожен процес має власні таблицю
+# транспозицій і впорядковувач, які лишаються «теплими» між ходами. Під pygbag процесів немає,
+# тому там завжди працює однопотоковий пошук
+def choose_hard_bot_move_parallel(current_position_hb, color_of_bot_hb, think_time_ms_hb=None, workers_hb=None):
+    book_move_hb = probe_opening_book(current_position_hb, color_of_bot_hb)
+    if book_move_hb: return book_move_hb
+    tablebase_move_hb = probe_tablebase_move(current_position_hb, color_of_bot_hb)
+    if tablebase_move_hb: return tablebase_move_hb
+    best_move_hb, _, _ = search_root_parallel(current_position_hb, color_of_bot_hb, think_time_ms_hb, workers_hb)
+    return best_move_hb
+
+def search_root_parallel(current_position_hb, color_of_bot_hb, think_time_ms_hb=None, workers_hb=None):
+    # Те саме, що search_root, але ходи кореня рахуються в кількох процесах
+    all_moves_hb = get_all_valid_moves_for_bot(current_position_hb, color_of_bot_hb)
+    if not PARALLEL_SEARCH_AVAILABLE or len(all_moves_hb) <= 1:
+        return run_to_completion(search_root(current_position_hb, color_of_bot_hb, think_time_ms_hb))
+    if think_time_ms_hb is None: think_time_ms_hb = BOT_THINK_TIME_MS
+    executor_hb = get_parallel_executor(workers_hb)
+    workers_count_hb = min(parallel_executor_workers, len(all_moves_hb))
+    # Впорядковані ходи роздаються по колу, щоб кожен процес отримав і сильні, і слабкі кандидати
+    move_orderer.order(current_position_hb, all_moves_hb)
+    packed_hb = current_position_hb.pack()
+    futures_hb = [
+        executor_hb.submit(_search_root_worker, packed_hb, color_of_bot_hb, think_time_ms_hb, all_moves_hb[index_hb::workers_count_hb])
+        for index_hb in range(workers_count_hb)
+    ]
+    results_hb = [future_hb.result() for future_hb in futures_hb]
+    # Лічильники процесів підсумовуються; ітерації у кожного процесу свої, тому їх не зводимо
+    search_stats.reset()
+    for _, _, _, worker_stats_hb in results_hb:
+        for field_hb in SearchStats.FIELDS:
+            setattr(search_stats, field_hb, getattr(search_stats, field_hb) + worker_stats_hb[field_hb])
+        search_stats.time_ms = max(search_stats.time_ms, worker_stats_hb["time_ms"])
+    best_move_hb, best_eval_hb, completed_depth_hb, _ = max(results_hb, key=lambda result_hb: result_hb[1])
+    if SEARCH_LOG_PATH:
+        write_search_log(current_position_hb, best_move_hb)
+    return best_move_hb, best_eval_hb, completed_depth_hb
+
+def _search_root_worker(packed_position_hb, color_of_bot_hb, think_time_ms_hb, root_moves_hb):
+    position_hb = Position.unpack(packed_position_hb)
+    best_move_hb, best_eval_hb, completed_depth_hb = run_to_completion(search_root(position_hb, color_of_bot_hb, think_time_ms_hb, root_moves_hb=root_moves_hb))
+    return best_move_hb, best_eval_hb, completed_depth_hb, search_stats.as_dict()
+
+def get_parallel_executor(workers_pe=None):
+    # Без явної кількості — BOT_PARALLEL_WORKERS, а якщо він 0, то за кількістю ядер
+    global parallel_executor, parallel_executor_workers
+    if workers_pe is None: workers_pe = BOT_PARALLEL_WORKERS or os.cpu_count() or 1
+    if parallel_executor is None or parallel_executor_workers != workers_pe:
+        shutdown_parallel_executor()
+        parallel_executor = ProcessPoolExecutor(max_workers=workers_pe)
+        parallel_executor_workers = workers_pe
+    return parallel_executor
+
+def shutdown_parallel_executor():
+    global parallel_executor, parallel_executor_workers
+    if parallel_executor is not None:
+        parallel_executor.shutdown(cancel_futures=True)
+        parallel_executor = None
+        parallel_executor_workers = 0
@@ -0,0 +1,839 @@
+import random
+
+# --- Шаховий рушій без залежності від pygame ---
+# Позиція зберігається як плоский масив із 64 цілих чисел (mailbox).
+# Індекс клітинки: row * 8 + col, де row 0 — восьма горизонталь, як у BOARD з main.py.
+# Код фігури: тип | (колір << 3), тобто білі фігури 1..6, чорні 9..14, порожня клітинка 0.
+
+# --- Кольори та типи фігур ---
+WHITE, BLACK = 0, 1
+EMPTY, PAWN, KNIGHT, BISHOP, ROOK, QUEEN, KING = 0, 1, 2, 3, 4, 5, 6
+
+COLOR_NAMES = ("white", "black")
+COLOR_INDEX = {"white": WHITE, "black": BLACK}
+TYPE_NAMES = (None, "pawn", "knight", "bishop", "rook", "queen", "king")
+
+# --- Цінність фігур для бота (індекс — тип фігури) ---
+PIECE_VALUES = (0, 10, 30, 30, 50, 90, 0)
+
+# --- Права на рокіровку (бітова маска) ---
+CASTLE_WK, CASTLE_WQ, CASTLE_BK, CASTLE_BQ = 1, 2, 4, 8
+ALL_CASTLING = CASTLE_WK | CASTLE_WQ | CASTLE_BK | CASTLE_BQ
+
+ALL_SQUARES = (1 << 64) - 1
+
+# --- Кодування ходу: from | to << 6 | promo << 12 | flag << 15 ---
+FLAG_NONE, FLAG_DOUBLE_PUSH, FLAG_EN_PASSANT, FLAG_CASTLE = 0, 1, 2, 3
+# Жоден справжній хід не кодується нулем (a8-a8), тож 0 позначає пропуск ходу
+NULL_MOVE = 0
+
+def make_piece(color, piece_type):
+    return piece_type | (color << 3)
+
+def piece_color(piece):
+    return piece >> 3
+
+def piece_type(piece):
+    return piece & 7
+
+def encode_move(from_sq, to_sq, promo=EMPTY, flag=FLAG_NONE):
+    return from_sq | (to_sq << 6) | (promo << 12) | (flag << 15)
+
+def move_from(move):
+    return move & 63
+
+def move_to(move):
+    return (move >> 6) & 63
+
+def move_promo(move):
+    return (move >> 12) & 7
+
+def move_flag(move):
+    return move >> 15
+
+def square(row, col):
+    return row * 8 + col
+
+def square_row(sq):
+    return sq >> 3
+
+def square_col(sq):
+    return sq & 7
+
+SQUARE_NAMES = tuple('abcdefgh'[sq & 7] + '87654321'[sq >> 3] for sq in range(64))
+SQUARE_INDEX = {name: sq for sq, name in enumerate(SQUARE_NAMES)}
+
+PROMOTION_CHARS = ('', '', 'n', 'b', 'r', 'q')
+
+def move_to_uci(move):
+    return SQUARE_NAMES[move & 63] + SQUARE_NAMES[(move >> 6) & 63] + PROMOTION_CHARS[(move >> 12) & 7]
+
+START_FEN = "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1"
+FEN_PIECE_TYPES = {'p': PAWN, 'n': KNIGHT, 'b': BISHOP, 'r': ROOK, 'q': QUEEN, 'k': KING}
+FEN_CASTLING = {'K': CASTLE_WK, 'Q': CASTLE_WQ, 'k': CASTLE_BK, 'q': CASTLE_BQ}
+
+FEN_PIECE_CHARS = {}
+for _ch, _type in FEN_PIECE_TYPES.items():
+    FEN_PIECE_CHARS[make_piece(WHITE, _type)] = _ch.upper()
+    FEN_PIECE_CHARS[make_piece(BLACK, _type)] = _ch
+
+# --- Перетворення між кодами фігур та рядками "color_type" з UI ---
+PIECE_NAMES = {}
+PIECE_CODES = {}
+for _color in (WHITE, BLACK):
+    for _type in range(PAWN, KING + 1):
+        _name = f"{COLOR_NAMES[_color]}_{TYPE_NAMES[_type]}"
+        PIECE_NAMES[make_piece(_color, _type)] = _name
+        PIECE_CODES[_name] = make_piece(_color, _type)
+
+# --- Попередньо обчислені таблиці атак ---
+ORTHOGONAL_DIRECTIONS = ((0, 1), (0, -1), (1, 0), (-1, 0))
+DIAGONAL_DIRECTIONS = ((1, 1), (1, -1), (-1, 1), (-1, -1))
+KNIGHT_OFFSETS = ((-2, -1), (-2, 1), (-1, -2), (-1, 2), (1, -2), (1, 2), (2, -1), (2, 1))
+KING_OFFSETS = ((-1, -1), (-1, 0), (-1, 1), (0, -1), (0, 1), (1, -1), (1, 0), (1, 1))
+
+def _jump_targets(sq, offsets):
+    row, col = sq >> 3, sq & 7
+    return tuple(square(row + dr, col + dc) for dr, dc in offsets if 0 <= row + dr < 8 and 0 <= col + dc < 8)
+
+def _ray(sq, dr, dc):
+    row, col = sq >> 3, sq & 7
+    squares = []
+    row, col = row + dr, col + dc
+    while 0 <= row < 8 and 0 <= col < 8:
+        squares.append(square(row, col))
+        row, col = row + dr, col + dc
+    return tuple(squares)
+
+KNIGHT_TARGETS = tuple(_jump_targets(sq, KNIGHT_OFFSETS) for sq in range(64))
+KING_TARGETS = tuple(_jump_targets(sq, KING_OFFSETS) for sq in range(64))
+ORTHOGONAL_RAYS = tuple(tuple(r for r in (_ray(sq, dr, dc) for dr, dc in ORTHOGONAL_DIRECTIONS) if r) for sq in range(64))
+DIAGONAL_RAYS = tuple(tuple(r for r in (_ray(sq, dr, dc) for dr, dc in DIAGONAL_DIRECTIONS) if r) for sq in range(64))
+SLIDER_RAYS = {
+    BISHOP: DIAGONAL_RAYS,
+    ROOK: ORTHOGONAL_RAYS,
+    QUEEN: tuple(ORTHOGONAL_RAYS[sq] + DIAGONAL_RAYS[sq] for sq in range(64)),
+}
+# Клітинки, які б'є пішак заданого кольору з клітинки sq
+PAWN_ATTACKS = (
+    tuple(_jump_targets(sq, ((-1, -1), (-1, 1))) for sq in range(64)),
+    tuple(_jump_targets(sq, ((1, -1), (1, 1))) for sq in range(64)),
+)
+PAWN_PUSH = (-8, 8)
+PAWN_START_ROW = (6, 1)
+PAWN_PROMOTION_ROW = (0, 7)
+PROMOTION_TYPES = (QUEEN, ROOK, BISHOP, KNIGHT)
+
+# Права, які залишаються після ходу з/на клітинку (рух короля чи тури або взяття тури)
+CASTLING_MASK = [ALL_CASTLING] * 64
+CASTLING_MASK[square(7, 4)] = ALL_CASTLING & ~(CASTLE_WK | CASTLE_WQ)
+CASTLING_MASK[square(7, 7)] = ALL_CASTLING & ~CASTLE_WK
+CASTLING_MASK[square(7, 0)] = ALL_CASTLING & ~CASTLE_WQ
+CASTLING_MASK[square(0, 4)] = ALL_CASTLING & ~(CASTLE_BK | CASTLE_BQ)
+CASTLING_MASK[square(0, 7)] = ALL_CASTLING & ~CASTLE_BK
+CASTLING_MASK[square(0, 0)] = ALL_CASTLING & ~CASTLE_BQ
+CASTLING_MASK = tuple(CASTLING_MASK)
+
+# Клітинка призначення короля -> (звідки тура, куди тура)
+CASTLING_ROOK_SQUARES = {
+    square(7, 6): (square(7, 7), square(7, 5)),
+    square(7, 2): (square(7, 0), square(7, 3)),
+    square(0, 6): (square(0, 7), square(0, 5)),
+    square(0, 2): (square(0, 0), square(0, 3)),
+}
+
+# --- Оцінка: матеріал + таблиці позицій фігур, плавний перехід від мітельшпілю до ендшпілю ---
+# Значення в сотих пішака; таблиці записані з боку білих, перший рядок — восьма горизонталь
+MATERIAL_MG = (0, 100, 320, 330, 500, 900, 0)
+MATERIAL_EG = (0, 120, 300, 320, 520, 920, 0)
+PHASE_WEIGHTS = (0, 0, 1, 1, 2, 4, 0)
+MAX_PHASE = 24
+
+PAWN_TABLE_MG = (
+      0,   0,   0,   0,   0,   0,   0,   0,
+     50,  50,  50,  50,  50,  50,  50,  50,
+     10,  10,  20,  30,  30,  20,  10,  10,
+      5,   5,  10,  25,  25,  10,   5,   5,
+      0,   0,   0,  20,  20,   0,   0,   0,
+      5,  -5, -10,   0,   0, -10,  -5,   5,
+      5,  10,  10, -20, -20,  10,  10,   5,
+      0,   0,   0,   0,   0,   0,   0,   0,
+)
+PAWN_TABLE_EG = (
+      0,   0,   0,   0,   0,   0,   0,   0,
+     80,  80,  80,  80,  80,  80,  80,  80,
+     50,  50,  50,  50,  50,  50,  50,  50,
+     30,  30,  30,  30,  30,  30,  30,  30,
+     15,  15,  15,  15,  15,  15,  15,  15,
+      5,   5,   5,   5,   5,   5,   5,   5,
+      0,   0,   0,   0,   0,   0,   0,   0,
+      0,   0,   0,   0,   0,   0,   0,   0,
+)
+KNIGHT_TABLE = (
+    -50, -40, -30, -30, -30, -30, -40, -50,
+    -40, -20,   0,   0,   0,   0, -20, -40,
+    -30,   0,  10,  15,  15,  10,   0, -30,
+    -30,   5,  15,  20,  20,  15,   5, -30,
+    -30,   0,  15,  20,  20,  15,   0, -30,
+    -30,   5,  10,  15,  15,  10,   5, -30,
+    -40, -20,   0,   5,   5,   0, -20, -40,
+    -50, -40, -30, -30, -30, -30, -40, -50,
+)
+BISHOP_TABLE = (
+    -20, -10, -10, -10, -10, -10, -10, -20,
+    -10,   0,   0,   0,   0,   0,   0, -10,
+    -10,   0,   5,  10,  10,   5,   0, -10,
+    -10,   5,   5,  10,  10,   5,   5, -10,
+    -10,   0,  10,  10,  10,  10,   0, -10,
+    -10,  10,  10,  10,  10,  10,  10, -10,
+    -10,   5,   0,   0,   0,   0,   5, -10,
+    -20, -10, -10, -10, -10, -10, -10, -20,
+)
+ROOK_TABLE = (
+      0,   0,   0,   0,   0,   0,   0,   0,
+      5,  10,  10,  10,  10,  10,  10,   5,
+     -5,   0,   0,   0,   0,   0,   0,  -5,
+     -5,   0,   0,   0,   0,   0,   0,  -5,
+     -5,   0,   0,   0,   0,   0,   0,  -5,
+     -5,   0,   0,   0,   0,   0,   0,  -5,
+     -5,   0,   0,   0,   0,   0,   0,  -5,
+      0,   0,   0,   5,   5,   0,   0,   0,
+)
+QUEEN_TABLE = (
+    -20, -10, -10,  -5,  -5, -10, -10, -20,
+    -10,   0,   0,   0,   0,   0,   0, -10,
+    -10,   0,   5,   5,   5,   5,   0, -10,
+     -5,   0,   5,   5,   5,   5,   0,  -5,
+      0,   0,   5,   5,   5,   5,   0,  -5,
+    -10,   5,   5,   5,   5,   5,   0, -10,
+    -10,   0,   5,   0,   0,   0,   0, -10,
+    -20, -10, -10,  -5,  -5, -10, -10, -20,
+)
+KING_TABLE_MG = (
+    -30, -40, -40, -50, -50, -40, -40, -30,
+    -30, -40, -40, -50, -50, -40, -40, -30,
+    -30, -40, -40, -50, -50, -40, -40, -30,
+    -30, -40, -40, -50, -50, -40, -40, -30,
+    -20, -30, -30, -40, -40, -30, -30, -20,
+    -10, -20, -20, -20, -20, -20, -20, -10,
+     20,  20,   0,   0,   0,   0,  20,  20,
+     20,  30,  10,   0,   0,  10,  30,  20,
+)
+KING_TABLE_EG = (
+    -50, -40, -30, -20, -20, -30, -40, -50,
+    -30, -20, -10,   0,   0, -10, -20, -30,
+    -30, -10,  20,  30,  30,  20, -10, -30,
+    -30, -10,  30,  40,  40,  30, -10, -30,
+    -30, -10,  30,  40,  40,  30, -10, -30,
+    -30, -10,  20,  30,  30,  20, -10, -30,
+    -30, -30,   0,   0,   0,   0, -30, -30,
+    -50, -30, -30, -30, -30, -30, -30, -50,
+)
+_TABLES_MG = (None, PAWN_TABLE_MG, KNIGHT_TABLE, BISHOP_TABLE, ROOK_TABLE, QUEEN_TABLE, KING_TABLE_MG)
+_TABLES_EG = (None, PAWN_TABLE_EG, KNIGHT_TABLE, BISHOP_TABLE, ROOK_TABLE, QUEEN_TABLE, KING_TABLE_EG)
+
+def _build_eval_table(material, tables):
+    # table[код фігури][клітинка] = матеріал + позиція, зі знаком "+" для білих і "-" для чорних
+    result = [[0] * 64 for _ in range(15)]
+    for pt in range(PAWN, KING + 1):
+        for sq in range(64):
+            result[make_piece(WHITE, pt)][sq] = material[pt] + tables[pt][sq]
+            result[make_piece(BLACK, pt)][sq] = -(material[pt] + tables[pt][sq ^ 56])
+    return result
+
+EVAL_MG = _build_eval_table(MATERIAL_MG, _TABLES_MG)
+EVAL_EG = _build_eval_table(MATERIAL_EG, _TABLES_EG)
+
+# --- Ключі Zobrist (фіксоване зерно, щоб ключі були однаковими між запусками) ---
+_zobrist_random = random.Random(0x5EED)
+ZOBRIST_PIECES = [[_zobrist_random.getrandbits(64) for _ in range(64)] for _ in range(15)]
+ZOBRIST_SIDE = _zobrist_random.getrandbits(64)
+ZOBRIST_CASTLING = [_zobrist_random.getrandbits(64) for _ in range(16)]
+ZOBRIST_EP_FILE = [_zobrist_random.getrandbits(64) for _ in range(8)]
+
+# --- Позиція ---
+class Position:
+    def __init__(self):
+        self.board = [EMPTY] * 64
+        self.side = WHITE
+        self.castling = 0
+        self.ep_square = -1
+        self.halfmove_clock = 0
+        self.fullmove_number = 1
+        self.king_sq = [-1, -1]
+        self.hash = 0
+        # Оцінка з боку білих, оновлюється в make_move
+        self.mg_score = 0
+        self.eg_score = 0
+        self.phase = 0
+        # Стек відкату: (хід, взята фігура, права на рокіровку, en passant, лічильник півходів, хеш, оцінка mg, eg, фаза)
+        self.undo_stack = []
+        # Скільки разів кожна позиція (за хешем) траплялася в партії, включно з поточною — повторення за O(1)
+        self.repetitions = {}
+
+    @classmethod
+    def from_grid(cls, grid, turn="white", castling_rights=None, ep_square=-1):
+        position = cls()
+        for row in range(8):
+            for col in range(8):
+                name = grid[row][col]
+                if name:
+                    code = PIECE_CODES[name]
+                    position.board[square(row, col)] = code
+                    if code & 7 == KING:
+                        position.king_sq[code >> 3] = square(row, col)
+        position.side = COLOR_INDEX[turn]
+        if castling_rights:
+            white_rights, black_rights = castling_rights["white"], castling_rights["black"]
+            if not white_rights["king_moved"]:
+                if not white_rights["rook_h1_moved"]: position.castling |= CASTLE_WK
+                if not white_rights["rook_a1_moved"]: position.castling |= CASTLE_WQ
+            if not black_rights["king_moved"]:
+                if not black_rights["rook_h8_moved"]: position.castling |= CASTLE_BK
+                if not black_rights["rook_a8_moved"]: position.castling |= CASTLE_BQ
+        position.ep_square = ep_square if position.ep_capturable(ep_square) else -1
+        position.hash = position.compute_hash()
+        position.repetitions = {position.hash: 1}
+        position.compute_evaluation()
+        return position
+
+    @classmethod
+    def from_fen(cls, fen):
+        fields = fen.split()
+        if len(fields) < 4:
+            raise ValueError(f"Некоректний FEN: '{fen}'")
+        position = cls()
+        rows = fields[0].split('/')
+        if len(rows) != 8:
+            raise ValueError(f"Некоректний FEN: '{fen}'")
+        for row, row_str in enumerate(rows):
+            col = 0
+            for ch in row_str:
+                if ch.isdigit():
+                    col += int(ch)
+                    continue
+                if ch.lower() not in FEN_PIECE_TYPES or col > 7:
+                    raise ValueError(f"Некоректний FEN: '{fen}'")
+                color = WHITE if ch.isupper() else BLACK
+                code = make_piece(color, FEN_PIECE_TYPES[ch.lower()])
+                position.board[square(row, col)] = code
+                if code & 7 == KING:
+                    position.king_sq[color] = square(row, col)
+                col += 1
+            if col != 8:
+                raise ValueError(f"Некоректний FEN: '{fen}'")
+        position.side = WHITE if fields[1] == 'w' else BLACK
+        for ch in fields[2]:
+            position.castling |= FEN_CASTLING.get(ch, 0)
+        ep_square = SQUARE_INDEX[fields[3]] if fields[3] != '-' else -1
+        position.ep_square = ep_square if position.ep_capturable(ep_square) else -1
+        if len(fields) >= 6:
+            position.halfmove_clock = int(fields[4])
+            position.fullmove_number = int(fields[5])
+        position.hash = position.compute_hash()
+        position.repetitions = {position.hash: 1}
+        position.compute_evaluation()
+        return position
+
+    def to_grid(self):
+        board = self.board
+        return [[PIECE_NAMES.get(board[row * 8 + col]) for col in range(8)] for row in range(8)]
+
+    def to_fen(self):
+        rows = []
+        for row in range(8):
+            row_str = ""
+            empty = 0
+            for col in range(8):
+                piece = self.board[square(row, col)]
+                if not piece:
+                    empty += 1
+                    continue
+                if empty:
+                    row_str += str(empty)
+                    empty = 0
+                row_str += FEN_PIECE_CHARS[piece]
+            if empty:
+                row_str += str(empty)
+            rows.append(row_str)
+        castling = "".join(ch for ch, right in FEN_CASTLING.items() if self.castling & right) or "-"
+        # Поле en passant записується лише тоді, коли взяття справді можливе (як і в ключі Zobrist)
+        ep_square = SQUARE_NAMES[self.ep_square] if self.ep_square >= 0 else "-"
+        return f"{'/'.join(rows)} {'w' if self.side == WHITE else 'b'} {castling} {ep_square} {self.halfmove_clock} {self.fullmove_number}"
+
+    def copy(self):
+        position = Position.__new__(Position)
+        position.board = self.board[:]
+        position.side = self.side
+        position.castling = self.castling
+        position.ep_square = self.ep_square
+        position.halfmove_clock = self.halfmove_clock
+        position.fullmove_number = self.fullmove_number
+        position.king_sq = self.king_sq[:]
+        position.hash = self.hash
+        position.mg_score = self.mg_score
+        position.eg_score = self.eg_score
+        position.phase = self.phase
+        position.undo_stack = self.undo_stack[:]
+        position.repetitions = self.repetitions.copy()
+        return position
+
+    def pack(self):
+        # Компактний стан для передачі в інший процес: 64 байти дошки, кілька чисел та історія повторень
+        return (bytes(self.board), self.side, self.castling, self.ep_square, self.halfmove_clock, self.fullmove_number,
+                tuple(self.repetitions.items()))
+
+    @classmethod
+    def unpack(cls, state):
+        board, side, castling, ep_square, halfmove_clock, fullmove_number, repetitions = state
+        position = cls()
+        position.board = list(board)
+        for sq, piece in enumerate(position.board):
+            if piece & 7 == KING:
+                position.king_sq[piece >> 3] = sq
+        position.side = side
+        position.castling = castling
+        position.ep_square = ep_square
+        position.halfmove_clock = halfmove_clock
+        position.fullmove_number = fullmove_number
+        position.hash = position.compute_hash()
+        position.repetitions = dict(repetitions)
+        position.compute_evaluation()
+        return position
+
+    def compute_hash(self):
+        key = 0
+        for sq, piece in enumerate(self.board):
+            if piece: key ^= ZOBRIST_PIECES[piece][sq]
+        if self.side == BLACK: key ^= ZOBRIST_SIDE
+        key ^= ZOBRIST_CASTLING[self.castling]
+        if self.ep_square >= 0: key ^= ZOBRIST_EP_FILE[self.ep_square & 7]
+        return key
+
+    def compute_evaluation(self):
+        self.mg_score = self.eg_score = self.phase = 0
+        for sq, piece in enumerate(self.board):
+            if piece:
+                self.mg_score += EVAL_MG[piece][sq]
+                self.eg_score += EVAL_EG[piece][sq]
+                self.phase += PHASE_WEIGHTS[piece & 7]
+
+    def evaluate(self):
+        # Оцінка з погляду сторони, що ходить
+        phase = min(self.phase, MAX_PHASE)
+        score = (self.mg_score * phase + self.eg_score * (MAX_PHASE - phase)) // MAX_PHASE
+        return score if self.side == WHITE else -score
+
+    def ep_capturable(self, ep_square):
+        # En passant зберігаємо лише тоді, коли пішак сторони, що ходить, справді може взяти,
+        # інакше однакові позиції отримували б різні хеші
+        if ep_square < 0: return False
+        pawn = make_piece(self.side, PAWN)
+        board = self.board
+        for s in PAWN_ATTACKS[self.side ^ 1][ep_square]:
+            if board[s] == pawn: return True
+        return False
+
+    # --- Атаки ---
+    def is_square_attacked(self, sq, by_color):
+        board = self.board
+        pawn = make_piece(by_color, PAWN)
+        for s in PAWN_ATTACKS[by_color ^ 1][sq]:
+            if board[s] == pawn: return True
+        knight = make_piece(by_color, KNIGHT)
+        for s in KNIGHT_TARGETS[sq]:
+            if board[s] == knight: return True
+        king = make_piece(by_color, KING)
+        for s in KING_TARGETS[sq]:
+            if board[s] == king: return True
+        rook, queen = make_piece(by_color, ROOK), make_piece(by_color, QUEEN)
+        for ray in ORTHOGONAL_RAYS[sq]:
+            for s in ray:
+                p = board[s]
+                if p:
+                    if p == rook or p == queen: return True
+                    break
+        bishop = make_piece(by_color, BISHOP)
+        for ray in DIAGONAL_RAYS[sq]:
+            for s in ray:
+                p = board[s]
+                if p:
+                    if p == bishop or p == queen: return True
+                    break
+        return False
+
+    def in_check(self, color=None):
+        if color is None: color = self.side
+        king_sq = self.king_sq[color]
+        if king_sq < 0: return False
+        return self.is_square_attacked(king_sq, color ^ 1)
+
+    # --- Генерація ходів ---
+    def generate_moves(self, captures_only=False):
+        # captures_only: лише взяття та перетворення у ферзя (для форсованого пошуку)
+        moves = []
+        board = self.board
+        us = self.side
+        for sq in range(64):
+            p = board[sq]
+            if not p or p >> 3 != us: continue
+            self._generate_piece_moves(sq, p & 7, moves, captures_only)
+        return moves
+
+    def _generate_piece_moves(self, sq, pt, moves, captures_only=False):
+        board = self.board
+        them = self.side ^ 1
+        append = moves.append
+        if pt == PAWN:
+            self._generate_pawn_moves(sq, moves, captures_only)
+        elif pt == KNIGHT or pt == KING:
+            for t in (KNIGHT_TARGETS[sq] if pt == KNIGHT else KING_TARGETS[sq]):
+                q = board[t]
+                if q >> 3 == them if q else not captures_only: append(sq | (t << 6))
+            if pt == KING and not captures_only: self._generate_castling_moves(sq, moves)
+        else:
+            for ray in SLIDER_RAYS[pt][sq]:
+                for t in ray:
+                    q = board[t]
+                    if not q:
+                        if not captures_only: append(sq | (t << 6))
+                    else:
+                        if q >> 3 == them: append(sq | (t << 6))
+                        break
+
+    def _generate_pawn_moves(self, sq, moves, captures_only=False):
+        board = self.board
+        us = self.side
+        them = us ^ 1
+        push = PAWN_PUSH[us]
+        promotion_row = PAWN_PROMOTION_ROW[us]
+        fwd = sq + push
+        if board[fwd] == EMPTY:
+            if fwd >> 3 == promotion_row:
+                for promo in PROMOTION_TYPES[:1] if captures_only else PROMOTION_TYPES: moves.append(encode_move(sq, fwd, promo))
+            elif not captures_only:
+                moves.append(sq | (fwd << 6))
+                if sq >> 3 == PAWN_START_ROW[us] and board[fwd + push] == EMPTY:
+                    moves.append(encode_move(sq, fwd + push, EMPTY, FLAG_DOUBLE_PUSH))
+        for t in PAWN_ATTACKS[us][sq]:
+            q = board[t]
+            if q and q >> 3 == them:
+                if t >> 3 == promotion_row:
+                    for promo in PROMOTION_TYPES: moves.append(encode_move(sq, t, promo))
+                else:
+                    moves.append(sq | (t << 6))
+            elif t == self.ep_square:
+                moves.append(encode_move(sq, t, EMPTY, FLAG_EN_PASSANT))
+
+    def _generate_castling_moves(self, sq, moves):
+        us = self.side
+        if us == WHITE:
+            kingside, queenside, home = CASTLE_WK, CASTLE_WQ, square(7, 4)
+        else:
+            kingside, queenside, home = CASTLE_BK, CASTLE_BQ, square(0, 4)
+        if sq != home or not self.castling & (kingside | queenside): return
+        board = self.board
+        them = us ^ 1
+        if self.is_square_attacked(sq, them): return
+        if self.castling & kingside and board[sq + 1] == EMPTY and board[sq + 2] == EMPTY and \
+           not self.is_square_attacked(sq + 1, them):
+            moves.append(encode_move(sq, sq + 2, EMPTY, FLAG_CASTLE))
+        if self.castling & queenside and board[sq - 1] == EMPTY and board[sq - 2] == EMPTY and board[sq - 3] == EMPTY and \
+           not self.is_square_attacked(sq - 1, them):
+            moves.append(encode_move(sq, sq - 2, EMPTY, FLAG_CASTLE))
+
+    # --- Шахи та зв'язки ---
+    def checks_and_pins(self):
+        # Повертає (кількість шахуючих фігур, маска клітинок, що закривають шах, {клітинка зв'язаної фігури: маска лінії})
+        board = self.board
+        us = self.side
+        them = us ^ 1
+        king_sq = self.king_sq[us]
+        checkers = 0
+        check_mask = ALL_SQUARES
+        pins = {}
+        pawn, knight = make_piece(them, PAWN), make_piece(them, KNIGHT)
+        for s in PAWN_ATTACKS[us][king_sq]:
+            if board[s] == pawn:
+                checkers += 1
+                check_mask = 1 << s
+        for s in KNIGHT_TARGETS[king_sq]:
+            if board[s] == knight:
+                checkers += 1
+                check_mask = 1 << s
+        queen = make_piece(them, QUEEN)
+        for rays, slider in ((ORTHOGONAL_RAYS[king_sq], make_piece(them, ROOK)), (DIAGONAL_RAYS[king_sq], make_piece(them, BISHOP))):
+            for ray in rays:
+                line_mask = 0
+                pinned_sq = -1
+                for s in ray:
+                    line_mask |= 1 << s
+                    p = board[s]
+                    if not p: continue
+                    if p >> 3 == us:
+                        if pinned_sq >= 0: break
+                        pinned_sq = s
+                        continue
+                    if p == slider or p == queen:
+                        if pinned_sq < 0:
+                            checkers += 1
+                            check_mask = line_mask
+                        else:
+                            pins[pinned_sq] = line_mask
+                    break
+        return checkers, check_mask, pins
+
+    def legal_moves(self, captures_only=False):
+        checkers, check_mask, pins = self.checks_and_pins()
+        board = self.board
+        us = self.side
+        them = us ^ 1
+        king_sq = self.king_sq[us]
+        king = board[king_sq]
+        legal = []
+        for move in self.generate_moves(captures_only):
+            from_sq = move & 63
+            to_sq = (move >> 6) & 63
+            if from_sq == king_sq:
+                # Король не може ховатися від лінійної фігури вздовж лінії шаху, тому знімаємо його з дошки
+                board[king_sq] = EMPTY
+                attacked = self.is_square_attacked(to_sq, them)
+                board[king_sq] = king
+                if not attacked: legal.append(move)
+            elif checkers > 1:
+                continue
+            elif move >> 15 == FLAG_EN_PASSANT:
+                # Взяття на проході може відкрити горизонталь короля, тому перевіряємо його ходом
+                self.make_move(move)
+                if not self.is_square_attacked(king_sq, them): legal.append(move)
+                self.unmake_move()
+            elif (check_mask >> to_sq) & 1 and (from_sq not in pins or (pins[from_sq] >> to_sq) & 1):
+                legal.append(move)
+        return legal
+
+    def has_any_legal_move(self):
+        # Перевірка на мат/пат без повного списку ходів: зупиняємося на першому легальному ході
+        checkers, check_mask, pins = self.checks_and_pins()
+        board = self.board
+        us = self.side
+        them = us ^ 1
+        king_sq = self.king_sq[us]
+        king = board[king_sq]
+        # Спершу король: під подвійним шахом інших ходів немає. Рокіровку не перевіряємо —
+        # якщо вона легальна, то легальний і крок короля на сусідню клітинку
+        board[king_sq] = EMPTY
+        for t in KING_TARGETS[king_sq]:
+            q = board[t]
+            if (not q or q >> 3 == them) and not self.is_square_attacked(t, them):
+                board[king_sq] = king
+                return True
+        board[king_sq] = king
+        if checkers > 1: return False
+        moves = []
+        for sq in range(64):
+            p = board[sq]
+            if not p or p >> 3 != us or sq == king_sq: continue
+            moves.clear()
+            self._generate_piece_moves(sq, p & 7, moves)
+            for move in moves:
+                to_sq = (move >> 6) & 63
+                if move >> 15 == FLAG_EN_PASSANT:
+                    self.make_move(move)
+                    attacked = self.is_square_attacked(king_sq, them)
+                    self.unmake_move()
+                    if not attacked: return True
+                elif (check_mask >> to_sq) & 1 and (sq not in pins or (pins[sq] >> to_sq) & 1):
+                    return True
+        return False
+
+    def legal_moves_from(self, sq):
+        return [m for m in self.legal_moves() if m & 63 == sq]
+
+    # --- Виконання та відкат ходу ---
+    def make_move(self, move):
+        board = self.board
+        from_sq = move & 63
+        to_sq = (move >> 6) & 63
+        promo = (move >> 12) & 7
+        flag = move >> 15
+        us = self.side
+        piece = board[from_sq]
+        captured_sq = to_sq - PAWN_PUSH[us] if flag == FLAG_EN_PASSANT else to_sq
+        captured = board[captured_sq]
+        castling = self.castling
+        ep_square = self.ep_square
+        key = self.hash
+        mg_score, eg_score = self.mg_score, self.eg_score
+        self.undo_stack.append((move, captured, castling, ep_square, self.halfmove_clock, key, mg_score, eg_score, self.phase))
+
+        placed = make_piece(us, promo) if promo else piece
+        board[from_sq] = EMPTY
+        board[captured_sq] = EMPTY
+        board[to_sq] = placed
+        key ^= ZOBRIST_PIECES[piece][from_sq] ^ ZOBRIST_PIECES[placed][to_sq]
+        mg_score += EVAL_MG[placed][to_sq] - EVAL_MG[piece][from_sq]
+        eg_score += EVAL_EG[placed][to_sq] - EVAL_EG[piece][from_sq]
+        if promo:
+            self.phase += PHASE_WEIGHTS[promo]
+        if captured:
+            key ^= ZOBRIST_PIECES[captured][captured_sq]
+            mg_score -= EVAL_MG[captured][captured_sq]
+            eg_score -= EVAL_EG[captured][captured_sq]
+            self.phase -= PHASE_WEIGHTS[captured & 7]
+        if flag == FLAG_CASTLE:
+            rook_from, rook_to = CASTLING_ROOK_SQUARES[to_sq]
+            rook = board[rook_from]
+            board[rook_to] = rook
+            board[rook_from] = EMPTY
+            key ^= ZOBRIST_PIECES[rook][rook_from] ^ ZOBRIST_PIECES[rook][rook_to]
+            mg_score += EVAL_MG[rook][rook_to] - EVAL_MG[rook][rook_from]
+            eg_score += EVAL_EG[rook][rook_to] - EVAL_EG[rook][rook_from]
+        self.mg_score, self.eg_score = mg_score, eg_score
+        if piece & 7 == KING:
+            self.king_sq[us] = to_sq
+
+        self.castling = castling & CASTLING_MASK[from_sq] & CASTLING_MASK[to_sq]
+        key ^= ZOBRIST_CASTLING[castling] ^ ZOBRIST_CASTLING[self.castling]
+        if ep_square >= 0:
+            key ^= ZOBRIST_EP_FILE[ep_square & 7]
+        self.ep_square = -1
+        if flag == FLAG_DOUBLE_PUSH:
+            enemy_pawn = make_piece(us ^ 1, PAWN)
+            col = to_sq & 7
+            if (col > 0 and board[to_sq - 1] == enemy_pawn) or (col < 7 and board[to_sq + 1] == enemy_pawn):
+                self.ep_square = (from_sq + to_sq) >> 1
+                key ^= ZOBRIST_EP_FILE[col]
+        key ^= ZOBRIST_SIDE
+        self.hash = key
+        self.repetitions[key] = self.repetitions.get(key, 0) + 1
+        if piece & 7 == PAWN or captured:
+            self.halfmove_clock = 0
+        else:
+            self.halfmove_clock += 1
+        if us == BLACK:
+            self.fullmove_number += 1
+        self.side = us ^ 1
+        return captured
+
+    def make_null_move(self):
+        # Пропуск ходу для нуль-ходового відсікання; у стеку відкату позначається ходом NULL_MOVE.
+        # Позиція після пропуску в партії не траплялася, тож у repetitions не записується
+        self.undo_stack.append((NULL_MOVE, EMPTY, self.castling, self.ep_square, self.halfmove_clock, self.hash, self.mg_score, self.eg_score, self.phase))
+        key = self.hash ^ ZOBRIST_SIDE
+        if self.ep_square >= 0:
+            key ^= ZOBRIST_EP_FILE[self.ep_square & 7]
+        self.ep_square = -1
+        self.hash = key
+        self.halfmove_clock += 1
+        self.side ^= 1
+
+    def unmake_move(self):
+        if self.undo_stack[-1][0] != NULL_MOVE:
+            count = self.repetitions[self.hash] - 1
+            if count: self.repetitions[self.hash] = count
+            else: del self.repetitions[self.hash]
+        move, captured, castling, ep_square, halfmove_clock, self.hash, self.mg_score, self.eg_score, self.phase = self.undo_stack.pop()
+        if move == NULL_MOVE:
+            self.ep_square = ep_square
+            self.halfmove_clock = halfmove_clock
+            self.side ^= 1
+            return move
+        board = self.board
+        from_sq = move & 63
+        to_sq = (move >> 6) & 63
+        flag = move >> 15
+        us = self.side ^ 1
+        piece = make_piece(us, PAWN) if (move >> 12) & 7 else board[to_sq]
+
+        board[from_sq] = piece
+        if flag == FLAG_EN_PASSANT:
+            board[to_sq] = EMPTY
+            board[to_sq - PAWN_PUSH[us]] = captured
+        else:
+            board[to_sq] = captured
+            if flag == FLAG_CASTLE:
+                rook_from, rook_to = CASTLING_ROOK_SQUARES[to_sq]
+                board[rook_from] = board[rook_to]
+                board[rook_to] = EMPTY
+        if piece & 7 == KING:
+            self.king_sq[us] = from_sq
+
+        self.castling = castling
+        self.ep_square = ep_square
+        self.halfmove_clock = halfmove_clock
+        if us == BLACK:
+            self.fullmove_number -= 1
+        self.side = us
+        return move
+
+    def unmake_to(self, ply):
+        while len(self.undo_stack) > ply:
+            self.unmake_move()
+
+    # --- Нічия за правилами ---
+    def repetition_count(self):
+        return self.repetitions.get(self.hash, 0)
+
+    def is_threefold_repetition(self):
+        return self.repetitions.get(self.hash, 0) >= 3
+
+    def is_fifty_move_draw(self):
+        # 100 півходів без ходу пішака та взяття; мат останнім ходом має перевагу, тож це перевіряється окремо
+        return self.halfmove_clock >= 100
+
+    def has_non_pawn_material(self, color):
+        for piece in self.board:
+            if piece >> 3 == color and KNIGHT <= piece & 7 <= QUEEN:
+                return True
+        return False
+
+    def is_capture(self, move):
+        return self.board[(move >> 6) & 63] != EMPTY or move >> 15 == FLAG_EN_PASSANT
+
+    def find_move(self, from_sq, to_sq, promo=QUEEN):
+        candidates = [m for m in self.legal_moves() if m & 63 == from_sq and (m >> 6) & 63 == to_sq]
+        for move in candidates:
+            if (move >> 12) & 7 in (EMPTY, promo):
+                return move
+        return candidates[0] if candidates else None
+
+# --- Стандартна алгебраїчна нотація (SAN) ---
+SAN_PIECE_LETTERS = ('', '', 'N', 'B', 'R', 'Q', 'K')
+
+def move_to_san(position, move):
+    # Позиція — до ходу; хід має бути легальним
+    from_sq = move & 63
+    to_sq = (move >> 6) & 63
+    promo = (move >> 12) & 7
+    pt = position.board[from_sq] & 7
+    if move >> 15 == FLAG_CASTLE:
+        san = "O-O" if to_sq & 7 == 6 else "O-O-O"
+    else:
+        is_capture = position.is_capture(move)
+        if pt == PAWN:
+            san = SQUARE_NAMES[from_sq][0] + "x" if is_capture else ""
+        else:
+            san = SAN_PIECE_LETTERS[pt]
+            # Уточнення, якщо на ту саму клітинку може піти однойменна фігура
+            rivals = [m & 63 for m in position.legal_moves()
+                      if (m >> 6) & 63 == to_sq and m & 63 != from_sq and position.board[m & 63] & 7 == pt]
+            if rivals:
+                if all(sq & 7 != from_sq & 7 for sq in rivals):
+                    san += SQUARE_NAMES[from_sq][0]
+                elif all(sq >> 3 != from_sq >> 3 for sq in rivals):
+                    san += SQUARE_NAMES[from_sq][1]
+                else:
+                    san += SQUARE_NAMES[from_sq]
+            if is_capture:
+                san += "x"
+        san += SQUARE_NAMES[to_sq]
+        if promo:
+            san += "=" + SAN_PIECE_LETTERS[promo]
+    position.make_move(move)
+    if position.in_check():
+        san += "+" if position.has_any_legal_move() else "#"
+    position.unmake_move()
+    return san
+
+def initial_position():
+    return Position.from_fen(START_FEN)
@@ -1,7 +1,18 @@
 import pygame
 import os
-import random
 import asyncio
+import time
+from engine import (
+    Position, COLOR_NAMES, COLOR_INDEX, QUEEN, FLAG_CASTLE,
+    TYPE_NAMES, square, square_row, square_col, move_from, move_to, move_promo, move_flag,
+)
+from pgn import export_position_pgn
+from bot import (
+    transposition_table, move_orderer, check_game_over_conditions_for_board,
+    choose_easy_bot_move, choose_medium_bot_move, search_hard_bot_move, BOT_FRAME_SLICE_MS, search_stats,
+    BOT_PONDER, start_pondering, ponderhit, stop_pondering,
+)
+from search import format_score
 
 # --- Конфігурація шляху до фігур ---
 FIGURES_FOLDER = "figures"
@@ -43,9 +54,6 @@ BUTTON_TEXT_COLOR = WHITE_COL
 LOG_BG_COLOR = (222, 226, 230)
 GAME_OVER_OVERLAY_COLOR = (45, 52, 54, 180)
 
-# --- Цінність фігур для бота ---
-PIECE_VALUES = {"pawn": 10, "knight": 30, "bishop": 30, "rook": 50, "queen": 90, "king": 0}
-
 # --- Шрифти ---
 font_name = "georgia"
 MENU_TITLE_FONT = pygame.font.SysFont(font_name, 70)
@@ -56,6 +64,10 @@ GAME_OVER_FONT = pygame.font.SysFont(font_name, 60)
 RESTART_BUTTON_FONT = pygame.font.SysFont(font_name, 40)
 NOTATION_FONT = pygame.font.SysFont(font_name, NOTATION_FONT_SIZE)
 LOG_FONT = pygame.font.SysFont(font_name, LOG_FONT_SIZE)
+# Панель статистики пошуку в нижній частині журналу (клавіша I)
+SEARCH_PANEL_HEIGHT = 190
+SEARCH_PANEL_FONT_SIZE = 15
+SEARCH_PANEL_FONT = pygame.font.SysFont(font_name, SEARCH_PANEL_FONT_SIZE)
 
 # --- Завантаження зображень фігур ---
 FIGURES = {}
@@ -94,13 +106,19 @@ INITIAL_CASTLING_RIGHTS = {
 }
 
 # --- Змінні стану гри та меню ---
-BOARD, castling_rights, selected_piece, possible_moves, in_check, current_turn, game_state, move_log = [], {}, None, [], None, "", "", []
+position = None
+BOARD, selected_piece, possible_moves, in_check, current_turn, game_state, move_log = [], None, [], None, "", "", []
 game_mode = None
 bot_difficulty = None
 player_chosen_color = None
 bot_color = None
 bot_is_thinking = False
 bot_thinking_message = ""
+show_search_panel = False
+# Обдумування на час гравця: очікуваний хід гравця, пошук-генератор і його результат, якщо він завершився сам
+ponder_move = 0
+ponder_search = None
+ponder_result = None
 
 white_king_button_img, black_king_button_img = None, None
 PIECE_BUTTON_SIZE = (SQUARE_SIZE, SQUARE_SIZE)
@@ -131,155 +149,18 @@ def get_piece_type(piece_name):
     if piece_name: return piece_name.split('_')[1]
     return None
 
-def is_valid_coord(row, col):
-    return 0 <= row < 8 and 0 <= col < 8
-
-def get_king_pos(color, board_state):
-    for r in range(8):
-        for c in range(8):
-            if board_state[r][c] == f"{color}_king": return (r, c)
-    return None
-
-def is_square_attacked(row, col, attacking_color, current_board):
-    pawn_direction = -1 if attacking_color == "white" else 1
-    for dc_pawn in [-1, 1]:
-        p_row, p_col = row - pawn_direction, col + dc_pawn
-        if is_valid_coord(p_row, p_col) and current_board[p_row][p_col] == f"{attacking_color}_pawn": return True
-    knight_moves_list = [(-2,-1),(-2,1),(-1,-2),(-1,2),(1,-2),(1,2),(2,-1),(2,1)]
-    for dr_k, dc_k in knight_moves_list:
-        n_row, n_col = row + dr_k, col + dc_k
-        if is_valid_coord(n_row, n_col) and current_board[n_row][n_col] == f"{attacking_color}_knight": return True
-    straight_directions_list = [(0,1),(0,-1),(1,0),(-1,0)]
-    for dr_s, dc_s in straight_directions_list:
-        for i_s in range(1,8):
-            t_row_s, t_col_s = row + dr_s*i_s, col + dc_s*i_s
-            if not is_valid_coord(t_row_s,t_col_s): break
-            piece_s = current_board[t_row_s][t_col_s]
-            if piece_s:
-                if get_piece_color(piece_s)==attacking_color and (get_piece_type(piece_s)=="rook" or get_piece_type(piece_s)=="queen"): return True
-                break
-    diag_directions_list = [(1,1),(1,-1),(-1,1),(-1,-1)]
-    for dr_d, dc_d in diag_directions_list:
-        for i_d in range(1,8):
-            t_row_d, t_col_d = row + dr_d*i_d, col + dc_d*i_d
-            if not is_valid_coord(t_row_d,t_col_d): break
-            piece_d = current_board[t_row_d][t_col_d]
-            if piece_d:
-                if get_piece_color(piece_d)==attacking_color and (get_piece_type(piece_d)=="bishop" or get_piece_type(piece_d)=="queen"): return True
-                break
-    king_moves_list_isa = [(-1,-1),(-1,0),(-1,1),(0,-1),(0,1),(1,-1),(1,0),(1,1)]
-    for dr_kg, dc_kg in king_moves_list_isa:
-        k_row, k_col = row + dr_kg, col + dc_kg
-        if is_valid_coord(k_row, k_col) and current_board[k_row][k_col] == f"{attacking_color}_king": return True
-    return False
-
-def check_for_check(board_state_to_check, color_to_check):
-    king_pos_val = get_king_pos(color_to_check, board_state_to_check)
-    if king_pos_val is None: return False
-    king_row, king_col = king_pos_val
-    opponent_color_val = "white" if color_to_check == "black" else "black"
-    return is_square_attacked(king_row, king_col, opponent_color_val, board_state_to_check)
-
-def add_move_if_valid(moves_list_param, current_r, current_c, target_r, target_c, p_color, board_state_param):
-    if not is_valid_coord(target_r, target_c): return False
-    target_piece_val = board_state_param[target_r][target_c]
-    target_color_val = get_piece_color(target_piece_val)
-    if target_piece_val is None:
-        moves_list_param.append((target_r, target_c))
-        return True
-    elif target_color_val != p_color:
-        moves_list_param.append((target_r, target_c))
-        return False
-    return False
-
-def get_possible_moves(row_param, col_param, board_state_param, current_castling_rights_param):
-    moves_list_gpm = []
-    piece_name_gpm = board_state_param[row_param][col_param]
-    if not piece_name_gpm: return moves_list_gpm
-    
-    piece_color_gpm = get_piece_color(piece_name_gpm)
-    piece_type_gpm = get_piece_type(piece_name_gpm)
-    
-    if piece_type_gpm == "pawn":
-        direction_pawn = -1 if piece_color_gpm == "white" else 1
-        target_row_one_step = row_param + direction_pawn
-        if is_valid_coord(target_row_one_step, col_param) and board_state_param[target_row_one_step][col_param] is None:
-            moves_list_gpm.append((target_row_one_step, col_param))
-            if (piece_color_gpm == "white" and row_param == 6) or (piece_color_gpm == "black" and row_param == 1):
-                target_row_two_steps = row_param + 2 * direction_pawn
-                if is_valid_coord(target_row_two_steps, col_param) and board_state_param[target_row_two_steps][col_param] is None:
-                    moves_list_gpm.append((target_row_two_steps, col_param))
-        for dc_pawn_cap in [-1, 1]:
-            target_row_capture = row_param + direction_pawn
-            target_col_capture = col_param + dc_pawn_cap
-            if is_valid_coord(target_row_capture, target_col_capture):
-                target_piece_cap = board_state_param[target_row_capture][target_col_capture]
-                if target_piece_cap and get_piece_color(target_piece_cap) != piece_color_gpm:
-                    moves_list_gpm.append((target_row_capture, target_col_capture))
-    elif piece_type_gpm == "rook":
-        directions_list_linear = [(0,1),(0,-1),(1,0),(-1,0)]
-        for dr_r, dc_r in directions_list_linear:
-            for i_r in range(1,8):
-                if not add_move_if_valid(moves_list_gpm, row_param, col_param, row_param+dr_r*i_r, col_param+dc_r*i_r, piece_color_gpm, board_state_param): break
-    elif piece_type_gpm == "knight":
-        knight_moves_gpm_list = [(-2,-1),(-2,1),(-1,-2),(-1,2),(1,-2),(1,2),(2,-1),(2,1)]
-        for dr_kn, dc_kn in knight_moves_gpm_list:
-            add_move_if_valid(moves_list_gpm, row_param, col_param, row_param+dr_kn, col_param+dc_kn, piece_color_gpm, board_state_param)
-    elif piece_type_gpm == "bishop":
-        directions_list_diag = [(1,1),(1,-1),(-1,1),(-1,-1)]
-        for dr_b, dc_b in directions_list_diag:
-            for i_b in range(1,8):
-                if not add_move_if_valid(moves_list_gpm, row_param, col_param, row_param+dr_b*i_b, col_param+dc_b*i_b, piece_color_gpm, board_state_param): break
-    elif piece_type_gpm == "queen":
-        directions_list_all = [(0,1),(0,-1),(1,0),(-1,0),(1,1),(1,-1),(-1,1),(-1,-1)]
-        for dr_q, dc_q in directions_list_all:
-            for i_q in range(1,8):
-                if not add_move_if_valid(moves_list_gpm, row_param, col_param, row_param+dr_q*i_q, col_param+dc_q*i_q, piece_color_gpm, board_state_param): break
-    elif piece_type_gpm == "king":
-        king_moves_gpm_direct = [(-1,-1),(-1,0),(-1,1),(0,-1),(0,1),(1,-1),(1,0),(1,1)]
-        for dr_kg_gpm, dc_kg_gpm in king_moves_gpm_direct:
-            add_move_if_valid(moves_list_gpm, row_param, col_param, row_param+dr_kg_gpm, col_param+dc_kg_gpm, piece_color_gpm, board_state_param)
-        king_start_row_gpm = 7 if piece_color_gpm == "white" else 0
-        if not current_castling_rights_param[piece_color_gpm]["king_moved"] and row_param == king_start_row_gpm and col_param == 4:
-            kingside_rook_key = "rook_h1_moved" if piece_color_gpm == "white" else "rook_h8_moved"
-            queenside_rook_key = "rook_a1_moved" if piece_color_gpm == "white" else "rook_a8_moved"
-            if not current_castling_rights_param[piece_color_gpm][kingside_rook_key] and board_state_param[king_start_row_gpm][5] is None and board_state_param[king_start_row_gpm][6] is None:
-                moves_list_gpm.append((king_start_row_gpm, 6))
-            if not current_castling_rights_param[piece_color_gpm][queenside_rook_key] and board_state_param[king_start_row_gpm][1] is None and board_state_param[king_start_row_gpm][2] is None and board_state_param[king_start_row_gpm][3] is None:
-                moves_list_gpm.append((king_start_row_gpm, 2))
-
-    valid_moves_after_filter_gpm = []
-    for move_r_gpm, move_c_gpm in moves_list_gpm:
-        temp_board_gpm = [r[:] for r in board_state_param]
-        moved_piece_temp_gpm = temp_board_gpm[row_param][col_param]
-        temp_board_gpm[move_r_gpm][move_c_gpm] = moved_piece_temp_gpm
-        temp_board_gpm[row_param][col_param] = None
-        
-        if get_piece_type(moved_piece_temp_gpm) == "king" and abs(move_c_gpm - col_param) == 2:
-            opponent_color_gpm = "black" if piece_color_gpm == "white" else "white"
-            if is_square_attacked(row_param, col_param, opponent_color_gpm, board_state_param):
-                continue 
-            path_col = 5 if move_c_gpm == 6 else 3
-            if is_square_attacked(row_param, path_col, opponent_color_gpm, board_state_param):
-                continue 
-            k_orig_row_gpm = row_param
-            rook_name_temp_gpm = f"{piece_color_gpm}_rook"
-            if move_c_gpm == 6: 
-                temp_board_gpm[k_orig_row_gpm][5] = rook_name_temp_gpm
-                temp_board_gpm[k_orig_row_gpm][7] = None
-            elif move_c_gpm == 2: 
-                temp_board_gpm[k_orig_row_gpm][3] = rook_name_temp_gpm
-                temp_board_gpm[k_orig_row_gpm][0] = None
-        
-        if not check_for_check(temp_board_gpm, piece_color_gpm):
-            valid_moves_after_filter_gpm.append((move_r_gpm, move_c_gpm))
-            
-    return valid_moves_after_filter_gpm
+def get_possible_moves(row_param, col_param, position_param):
+    targets_gpm = []
+    for move_gpm in position_param.legal_moves_from(square(row_param, col_param)):
+        target_gpm = (square_row(move_to(move_gpm)), square_col(move_to(move_gpm)))
+        if target_gpm not in targets_gpm:
+            targets_gpm.append(target_gpm)
+    return targets_gpm
 
 def to_algebraic(row, col):
     return 'abcdefgh'[col] + '87654321'[row]
 
-def get_move_notation_str(piece_name, start_pos_alg, end_pos_alg, is_capture, is_castling_type=None):
+def get_move_notation_str(piece_name, start_pos_alg, end_pos_alg, is_capture, is_castling_type=None, promotion_type=None):
     if is_castling_type:
         return is_castling_type
     p_type = get_piece_type(piece_name)
@@ -289,7 +170,12 @@ def get_move_notation_str(piece_name, start_pos_alg, end_pos_alg, is_capture, is
     elif p_type == "bishop": piece_char = "B"
     elif p_type == "queen": piece_char = "Q"
     elif p_type == "king": piece_char = "K"
-    return f"{piece_char}{start_pos_alg}{'x' if is_capture else '–'}{end_pos_alg}"
+    promotion_suffix = ""
+    if promotion_type == "queen": promotion_suffix = "=Q"
+    elif promotion_type == "rook": promotion_suffix = "=R"
+    elif promotion_type == "bishop": promotion_suffix = "=B"
+    elif promotion_type == "knight": promotion_suffix = "=N"
+    return f"{piece_char}{start_pos_alg}{'x' if is_capture else '–'}{end_pos_alg}{promotion_suffix}"
 
 # --- Функції малювання ---
 def draw_board_and_notations():
@@ -330,9 +216,9 @@ def draw_highlight():
             s.fill(HIGHLIGHT_COLOR)
             SCREEN.blit(s, (BOARD_START_X + mc * SQUARE_SIZE, BOARD_START_Y + mr * SQUARE_SIZE))
     if in_check:
-        king_pos_draw = get_king_pos(in_check, BOARD)
-        if king_pos_draw:
-            kr, kc = king_pos_draw
+        king_sq_draw = position.king_sq[COLOR_INDEX[in_check]]
+        if king_sq_draw >= 0:
+            kr, kc = square_row(king_sq_draw), square_col(king_sq_draw)
             s = pygame.Surface((SQUARE_SIZE, SQUARE_SIZE), pygame.SRCALPHA)
             s.fill(CHECK_COLOR)
             SCREEN.blit(s, (BOARD_START_X + kc * SQUARE_SIZE, BOARD_START_Y + kr * SQUARE_SIZE))
@@ -343,6 +229,9 @@ def draw_game_log():
     pygame.draw.rect(SCREEN, BLACK_COL, log_area_rect, 2)
     y_pos_log = LOG_START_Y + 5
     max_log_height = LOG_START_Y + BOARD_SIZE_PX - 25 
+    if show_search_panel:
+        max_log_height -= SEARCH_PANEL_HEIGHT
+        draw_search_panel(pygame.Rect(LOG_START_X, max_log_height, LOG_AREA_WIDTH, SEARCH_PANEL_HEIGHT))
     start_index_log = 0
     
     available_height = max_log_height - y_pos_log
@@ -370,6 +259,35 @@ def draw_game_log():
         msg_rect = msg_surf.get_rect(centerx=log_area_rect.centerx, bottom=log_area_rect.bottom - 5)
         SCREEN.blit(msg_surf, msg_rect)
 
+def draw_search_panel(panel_rect):
+    # Статистика останнього (або поточного) пошуку важкого бота
+    pygame.draw.line(SCREEN, BLACK_COL, panel_rect.topleft, panel_rect.topright, 1)
+    last_iteration_sp = search_stats.iterations[-1] if search_stats.iterations else None
+    lines_sp = ["Пошук бота"]
+    if last_iteration_sp:
+        lines_sp.append(f"Глибина: {last_iteration_sp['depth']}, оцінка: {format_score(last_iteration_sp['score'])}")
+    lines_sp.append(f"Вузли: {search_stats.nodes}, форс.: {search_stats.qnodes}")
+    lines_sp.append(f"TT: {search_stats.tt_hits}/{search_stats.tt_probes}, відсік.: {search_stats.tt_cutoffs}")
+    lines_sp.append(f"Розгалуження: {search_stats.branching_factor():.2f}")
+    if last_iteration_sp:
+        time_ms_sp = max(last_iteration_sp['time_ms'], 1.0)
+        lines_sp.append(f"Час: {last_iteration_sp['time_ms']:.0f} мс, {last_iteration_sp['nodes'] / time_ms_sp:.1f} тис. вузлів/с")
+        # Час по глибинах — останні кілька ітерацій
+        lines_sp.append("мс: " + " ".join(f"{it_sp['depth']}:{it_sp['time_ms']:.0f}" for it_sp in search_stats.iterations[-4:]))
+        # Головна варіація переноситься по словах у ширину панелі
+        pv_line_sp = "PV:"
+        for uci_sp in last_iteration_sp['pv']:
+            if SEARCH_PANEL_FONT.size(f"{pv_line_sp} {uci_sp}")[0] > panel_rect.width - 10:
+                lines_sp.append(pv_line_sp)
+                pv_line_sp = " "
+            pv_line_sp = f"{pv_line_sp} {uci_sp}"
+        lines_sp.append(pv_line_sp)
+    y_pos_sp = panel_rect.top + 4
+    for line_sp in lines_sp:
+        if y_pos_sp + SEARCH_PANEL_FONT_SIZE > panel_rect.bottom: break
+        SCREEN.blit(SEARCH_PANEL_FONT.render(line_sp, True, BLACK_COL), (panel_rect.left + 5, y_pos_sp))
+        y_pos_sp += SEARCH_PANEL_FONT_SIZE + 2
+
 def draw_game_over_screen():
     current_go_btn_rect = pygame.Rect(SCREEN_WIDTH // 2 - 100, SCREEN_HEIGHT // 2 + 20, 200, 50)
     if game_state != 'playing' and "menu" not in game_state:
@@ -382,6 +300,10 @@ def draw_game_over_screen():
             text_content_go = f"Мат! Перемога за {winner_color_go}!"
         elif "stalemate" in game_state:
             text_content_go = "Пат! Нічия!"
+        elif game_state == "repetition_draw":
+            text_content_go = "Триразове повторення! Нічия!"
+        elif game_state == "fifty_moves_draw":
+            text_content_go = "50 ходів без взять! Нічия!"
         
         text_surface_go = GAME_OVER_FONT.render(text_content_go, True, WHITE_COL)
         text_rect_go = text_surface_go.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 - 60))
@@ -443,52 +365,43 @@ def draw_bot_color_menu(mouse_pos_bcm):
 def check_game_over_conditions(player_to_check_color_cgoc):
     global game_state
     if game_state != 'playing': return 
-    all_legal_moves_for_player_cgoc = get_all_valid_moves_for_bot(BOARD, player_to_check_color_cgoc, castling_rights)
-    if not all_legal_moves_for_player_cgoc: 
-        king_is_currently_in_check_cgoc = check_for_check(BOARD, player_to_check_color_cgoc)
+    if check_game_over_conditions_for_board(position, player_to_check_color_cgoc):
+        king_is_currently_in_check_cgoc = position.in_check(COLOR_INDEX[player_to_check_color_cgoc])
         if king_is_currently_in_check_cgoc:
             winner_cgoc = "white" if player_to_check_color_cgoc == "black" else "black"
             game_state = f"checkmate_{winner_cgoc}_wins"
         else:
             game_state = "stalemate_draw"
+    # Нічия за правилами; історія хешів у Position, тож перевірка — O(1) на хід
+    elif position.is_threefold_repetition():
+        game_state = "repetition_draw"
+    elif position.is_fifty_move_draw():
+        game_state = "fifty_moves_draw"
             
-def make_move(start_pos_mm, end_pos_mm):
-    global in_check, current_turn, game_state, move_log, castling_rights, BOARD, selected_piece, possible_moves
+def make_move(start_pos_mm, end_pos_mm, promotion_mm=QUEEN):
+    global in_check, current_turn, game_state, move_log, BOARD, selected_piece, possible_moves
     start_row_mm, start_col_mm = start_pos_mm
     end_row_mm, end_col_mm = end_pos_mm
     
+    move_mm = position.find_move(square(start_row_mm, start_col_mm), square(end_row_mm, end_col_mm), promotion_mm)
+    if move_mm is None: return False
+
     moved_piece_name_mm = BOARD[start_row_mm][start_col_mm]
     start_pos_alg_mm = to_algebraic(start_row_mm, start_col_mm)
     end_pos_alg_mm = to_algebraic(end_row_mm, end_col_mm)
-    is_capture_mm = BOARD[end_row_mm][end_col_mm] is not None
+    is_capture_mm = position.is_capture(move_mm)
     castling_type_for_log_mm = None
-
-    piece_mm = BOARD[start_row_mm][start_col_mm]
-    piece_color_mm = get_piece_color(piece_mm)
-    piece_type_mm = get_piece_type(piece_mm)
-
-    if piece_type_mm == "king": castling_rights[piece_color_mm]["king_moved"] = True
-    elif piece_type_mm == "rook":
-        if piece_color_mm=="white":
-            if start_row_mm==7 and start_col_mm==0: castling_rights["white"]["rook_a1_moved"]=True
-            elif start_row_mm==7 and start_col_mm==7: castling_rights["white"]["rook_h1_moved"]=True
-        elif piece_color_mm=="black":
-            if start_row_mm==0 and start_col_mm==0: castling_rights["black"]["rook_a8_moved"]=True
-            elif start_row_mm==0 and start_col_mm==7: castling_rights["black"]["rook_h8_moved"]=True
-    
-    if piece_type_mm == "king" and abs(end_col_mm - start_col_mm) == 2:
-        rook_orig_c_mm, rook_target_c_mm = (7,5) if end_col_mm==6 else (0,3)
-        BOARD[start_row_mm][rook_target_c_mm] = BOARD[start_row_mm][rook_orig_c_mm]
-        BOARD[start_row_mm][rook_orig_c_mm] = None
+    if move_flag(move_mm) == FLAG_CASTLE:
         castling_type_for_log_mm = "O-O" if end_col_mm == 6 else "O-O-O"
+    promotion_type_mm = TYPE_NAMES[move_promo(move_mm)]
 
-    BOARD[end_row_mm][end_col_mm] = piece_mm
-    BOARD[start_row_mm][start_col_mm] = None
+    position.make_move(move_mm)
+    BOARD = position.to_grid()
     
-    current_move_str_mm = get_move_notation_str(moved_piece_name_mm, start_pos_alg_mm, end_pos_alg_mm, is_capture_mm, castling_type_for_log_mm)
+    current_move_str_mm = get_move_notation_str(moved_piece_name_mm, start_pos_alg_mm, end_pos_alg_mm, is_capture_mm, castling_type_for_log_mm, promotion_type_mm)
     
-    opponent_color_mm = "white" if piece_color_mm == "black" else "black"
-    is_opponent_in_check_after_move_mm = check_for_check(BOARD, opponent_color_mm)
+    opponent_color_mm = COLOR_NAMES[position.side]
+    is_opponent_in_check_after_move_mm = position.in_check()
     
     if is_opponent_in_check_after_move_mm:
         in_check = opponent_color_mm
@@ -505,16 +418,29 @@ def make_move(start_pos_mm, end_pos_mm):
     possible_moves = []
     return True
 
+def get_game_pgn():
+    if game_state.startswith("checkmate_white"): result_pgn = "1-0"
+    elif game_state.startswith("checkmate_black"): result_pgn = "0-1"
+    elif game_state.endswith("_draw"): result_pgn = "1/2-1/2"
+    else: result_pgn = "*"
+    players_pgn = {"white": "Гравець", "black": "Гравець"}
+    if game_mode == 'pve' and bot_color:
+        players_pgn[bot_color] = f"Бот ({bot_difficulty})"
+    return export_position_pgn(position, {"White": players_pgn["white"], "Black": players_pgn["black"]}, result_pgn)
+
 def initialize_game_board_state():
-    global BOARD, castling_rights, current_turn, selected_piece, possible_moves, in_check, move_log, bot_color, game_mode, player_chosen_color, game_state, bot_is_thinking
-    BOARD = [row[:] for row in INITIAL_BOARD]
-    castling_rights = {color: rights.copy() for color, rights in INITIAL_CASTLING_RIGHTS.items()}
+    global position, BOARD, current_turn, selected_piece, possible_moves, in_check, move_log, bot_color, game_mode, player_chosen_color, game_state, bot_is_thinking
+    position = Position.from_grid(INITIAL_BOARD, "white", INITIAL_CASTLING_RIGHTS)
+    BOARD = position.to_grid()
     current_turn = "white"
     selected_piece = None
     possible_moves = []
     in_check = None
     move_log = []
     bot_is_thinking = False
+    cancel_pondering()
+    transposition_table.clear()
+    move_orderer.clear()
     
     if game_mode == 'pve':
         if player_chosen_color == 'white':
@@ -524,157 +450,27 @@ def initialize_game_board_state():
     else:
         bot_color = None
     
-# --- Логіка бота ---
-def evaluate_board_state_minimax(board_state_mm_eval, player_color_mm_eval):
-    score_mm_eval = 0
-    for r_mm_eval in range(8):
-        for c_mm_eval in range(8):
-            piece_mm_eval = board_state_mm_eval[r_mm_eval][c_mm_eval]
-            if piece_mm_eval:
-                value_mm_eval = PIECE_VALUES.get(get_piece_type(piece_mm_eval), 0)
-                if get_piece_color(piece_mm_eval) == player_color_mm_eval:
-                    score_mm_eval += value_mm_eval
-                else:
-                    score_mm_eval -= value_mm_eval
-    return score_mm_eval
-
-def evaluate_move_medium(board_after_move_mb, bot_color_eval_mb, original_board_state_mb, move_tuple_mb):
-    score_mb = 0
-    opponent_color_eval_mb = "white" if bot_color_eval_mb == "black" else "black"
-    start_pos_mb, end_pos_mb = move_tuple_mb
-    moved_piece_name_mb = board_after_move_mb[end_pos_mb[0]][end_pos_mb[1]]
-    original_captured_piece_mb = original_board_state_mb[end_pos_mb[0]][end_pos_mb[1]]
-    if check_for_check(board_after_move_mb, opponent_color_eval_mb): score_mb += 50
-    if original_captured_piece_mb: score_mb += PIECE_VALUES.get(get_piece_type(original_captured_piece_mb), 0)
-    if moved_piece_name_mb and is_square_attacked(end_pos_mb[0], end_pos_mb[1], opponent_color_eval_mb, board_after_move_mb):
-        score_mb -= PIECE_VALUES.get(get_piece_type(moved_piece_name_mb), 0) * 0.5
-    if moved_piece_name_mb and is_square_attacked(start_pos_mb[0], start_pos_mb[1], opponent_color_eval_mb, original_board_state_mb) and \
-       not is_square_attacked(end_pos_mb[0], end_pos_mb[1], opponent_color_eval_mb, board_after_move_mb):
-        score_mb += PIECE_VALUES.get(get_piece_type(moved_piece_name_mb), 0) * 0.8
-    score_mb += random.uniform(-1, 1)
-    return score_mb
-
-def get_all_valid_moves_for_bot(current_board_state_bot, color_of_bot_param, current_castling_rights_state_bot):
-    all_moves_bot = []
-    for r_bot in range(8):
-        for c_bot in range(8):
-            piece_bot = current_board_state_bot[r_bot][c_bot]
-            if piece_bot and get_piece_color(piece_bot) == color_of_bot_param:
-                possible_piece_moves_bot = get_possible_moves(r_bot, c_bot, current_board_state_bot, current_castling_rights_state_bot)
-                for end_pos_move_bot in possible_piece_moves_bot:
-                    all_moves_bot.append(((r_bot, c_bot), end_pos_move_bot))
-    return all_moves_bot
-
-def check_game_over_conditions_for_board(board_state_cgofb, player_to_check_color_cgofb, current_castling_rights_cgofb):
-    all_legal_moves_cgofb = get_all_valid_moves_for_bot(board_state_cgofb, player_to_check_color_cgofb, current_castling_rights_cgofb)
-    return not all_legal_moves_cgofb
-
-def choose_easy_bot_move(current_board_state_eb, color_of_bot_eb, current_castling_rights_state_eb):
-    all_moves_eb = get_all_valid_moves_for_bot(current_board_state_eb, color_of_bot_eb, current_castling_rights_state_eb)
-    if not all_moves_eb:
-        return None
-    capture_moves = []
-    opponent_color = "white" if color_of_bot_eb == "black" else "black"
-    for move in all_moves_eb:
-        start_pos, end_pos = move
-        end_row, end_col = end_pos
-        target_piece = current_board_state_eb[end_row][end_col]
-        if target_piece and get_piece_color(target_piece) == opponent_color:
-            capture_moves.append(move)
-    if capture_moves:
-        return random.choice(capture_moves)
-    else:
-        return random.choice(all_moves_eb)
-
-def choose_medium_bot_move(current_board_state_mb, color_of_bot_mb, current_castling_rights_state_mb):
-    all_moves_mb = get_all_valid_moves_for_bot(current_board_state_mb, color_of_bot_mb, current_castling_rights_state_mb)
-    if not all_moves_mb: return None
-    best_score_mb = -float('inf')
-    best_moves_list_mb = []
-    for move_mb in all_moves_mb:
-        start_p_mb, end_p_mb = move_mb
-        temp_board_mb = [row[:] for row in current_board_state_mb]
-        moved_p_name_mb_sim = temp_board_mb[start_p_mb[0]][start_p_mb[1]]
-        temp_board_mb[end_p_mb[0]][end_p_mb[1]] = moved_p_name_mb_sim
-        temp_board_mb[start_p_mb[0]][start_p_mb[1]] = None
-        current_score_mb = evaluate_move_medium(temp_board_mb, color_of_bot_mb, current_board_state_mb, move_mb)
-        if current_score_mb > best_score_mb:
-            best_score_mb = current_score_mb
-            best_moves_list_mb = [move_mb]
-        elif current_score_mb == best_score_mb:
-            best_moves_list_mb.append(move_mb)
-    return random.choice(best_moves_list_mb) if best_moves_list_mb else None
-
-def minimax(board_state_mm, depth_mm, alpha_mm, beta_mm, maximizing_player_color_mm, is_maximizing_turn_mm, current_castling_rights_mm):
-    current_player_for_sim_moves = maximizing_player_color_mm if is_maximizing_turn_mm else ("white" if maximizing_player_color_mm == "black" else "black")
-    if depth_mm == 0 or check_game_over_conditions_for_board(board_state_mm, current_player_for_sim_moves, current_castling_rights_mm):
-        return evaluate_board_state_minimax(board_state_mm, maximizing_player_color_mm)
-    possible_next_moves_mm = get_all_valid_moves_for_bot(board_state_mm, current_player_for_sim_moves, current_castling_rights_mm)
-    if not possible_next_moves_mm:
-         return evaluate_board_state_minimax(board_state_mm, maximizing_player_color_mm)
-    if is_maximizing_turn_mm:
-        max_eval_mm = -float('inf')
-        for move_mm_max in possible_next_moves_mm:
-            start_p_mm_max, end_p_mm_max = move_mm_max
-            temp_board_mm_max = [row[:] for row in board_state_mm]
-            temp_castling_rights = {k:v.copy() for k,v in current_castling_rights_mm.items()}
-            moved_p_name_mm_max = temp_board_mm_max[start_p_mm_max[0]][start_p_mm_max[1]]
-            moved_p_type = get_piece_type(moved_p_name_mm_max)
-            moved_p_color = get_piece_color(moved_p_name_mm_max)
-            temp_board_mm_max[end_p_mm_max[0]][end_p_mm_max[1]] = moved_p_name_mm_max
-            temp_board_mm_max[start_p_mm_max[0]][start_p_mm_max[1]] = None
-            if moved_p_type == "king": temp_castling_rights[moved_p_color]["king_moved"] = True
-            eval_score_mm_max = minimax(temp_board_mm_max, depth_mm - 1, alpha_mm, beta_mm, maximizing_player_color_mm, False, temp_castling_rights)
-            max_eval_mm = max(max_eval_mm, eval_score_mm_max)
-            alpha_mm = max(alpha_mm, eval_score_mm_max)
-            if beta_mm <= alpha_mm: break
-        return max_eval_mm
-    else:
-        min_eval_mm = float('inf')
-        for move_mm_min in possible_next_moves_mm:
-            start_p_mm_min, end_p_mm_min = move_mm_min
-            temp_board_mm_min = [row[:] for row in board_state_mm]
-            temp_castling_rights = {k:v.copy() for k,v in current_castling_rights_mm.items()}
-            moved_p_name_mm_min = temp_board_mm_min[start_p_mm_min[0]][start_p_mm_min[1]]
-            moved_p_type = get_piece_type(moved_p_name_mm_min)
-            moved_p_color = get_piece_color(moved_p_name_mm_min)
-            temp_board_mm_min[end_p_mm_min[0]][end_p_mm_min[1]] = moved_p_name_mm_min
-            temp_board_mm_min[start_p_mm_min[0]][start_p_mm_min[1]] = None
-            if moved_p_type == "king": temp_castling_rights[moved_p_color]["king_moved"] = True
-            eval_score_mm_min = minimax(temp_board_mm_min, depth_mm - 1, alpha_mm, beta_mm, maximizing_player_color_mm, True, temp_castling_rights)
-            min_eval_mm = min(min_eval_mm, eval_score_mm_min)
-            beta_mm = min(beta_mm, eval_score_mm_min)
-            if beta_mm <= alpha_mm: break
-        return min_eval_mm
-
-def choose_hard_bot_move(current_board_state_hb, color_of_bot_hb, current_castling_rights_state_hb):
-    all_moves_hb = get_all_valid_moves_for_bot(current_board_state_hb, color_of_bot_hb, current_castling_rights_state_hb)
-    if not all_moves_hb: return None
-    best_move_hb = None
-    max_eval_for_bot_hb = -float('inf')
-    search_depth_hb = 1
-    for move_hb in all_moves_hb:
-        start_p_hb, end_p_hb = move_hb
-        temp_board_hb = [row[:] for row in current_board_state_hb]
-        temp_castling_rights_hb = {k:v.copy() for k,v in current_castling_rights_state_hb.items()}
-        moved_p_name_hb = temp_board_hb[start_p_hb[0]][start_p_hb[1]]
-        moved_p_type_hb = get_piece_type(moved_p_name_hb)
-        moved_p_color_hb = get_piece_color(moved_p_name_hb)
-        temp_board_hb[end_p_hb[0]][end_p_hb[1]] = moved_p_name_hb
-        temp_board_hb[start_p_hb[0]][start_p_hb[1]] = None
-        if moved_p_type_hb == "king": temp_castling_rights_hb[moved_p_color_hb]["king_moved"] = True
-        move_eval_hb = minimax(temp_board_hb, search_depth_hb, -float('inf'), float('inf'), color_of_bot_hb, False, temp_castling_rights_hb)
-        if move_eval_hb > max_eval_for_bot_hb:
-            max_eval_for_bot_hb = move_eval_hb
-            best_move_hb = move_hb
-        elif move_eval_hb == max_eval_for_bot_hb and random.choice([True,False]):
-            best_move_hb = move_hb
-    if not best_move_hb and all_moves_hb :
-        return random.choice(all_moves_hb)
-    return best_move_hb
+def cancel_pondering():
+    global ponder_move, ponder_search, ponder_result
+    if ponder_search is not None:
+        ponder_search.close()
+    stop_pondering()
+    ponder_move, ponder_search, ponder_result = 0, None, None
+
+async def ponder_bot_turn():
+    global ponder_search, ponder_result
+    # Поки гравець думає, пошук бота продовжується по квантах між кадрами
+    while ponder_search is not None and current_turn != bot_color and game_state == 'playing':
+        try:
+            next(ponder_search)
+        except StopIteration as stop_pbt:
+            ponder_search, ponder_result = None, stop_pbt.value
+            break
+        await asyncio.sleep(0)
 
 async def trigger_bot_turn():
-    global bot_is_thinking, BOARD, current_turn, castling_rights, game_mode, bot_color, bot_difficulty, game_state, possible_moves, selected_piece, bot_thinking_message
+    global bot_is_thinking, BOARD, current_turn, game_mode, bot_color, bot_difficulty, game_state, possible_moves, selected_piece, bot_thinking_message
+    global ponder_move, ponder_search, ponder_result
     
     if game_mode == 'pve' and current_turn == bot_color and not bot_is_thinking and game_state == 'playing':
         bot_is_thinking = True
@@ -683,19 +479,39 @@ async def trigger_bot_turn():
         chosen_move_tuple_tbt = None
         
         if bot_difficulty == 'easy':
-            chosen_move_tuple_tbt = choose_easy_bot_move(BOARD, bot_color, castling_rights)
+            chosen_move_tuple_tbt = choose_easy_bot_move(position, bot_color)
         elif bot_difficulty == 'medium':
-            chosen_move_tuple_tbt = choose_medium_bot_move(BOARD, bot_color, castling_rights)
+            chosen_move_tuple_tbt = choose_medium_bot_move(position, bot_color)
         elif bot_difficulty == 'hard':
-            chosen_move_tuple_tbt = choose_hard_bot_move(BOARD, bot_color, castling_rights)
+            last_move_tbt = position.undo_stack[-1][0] if position.undo_stack else 0
+            if ponder_move and last_move_tbt == ponder_move:
+                # Гравець зіграв очікуваний хід — продовжуємо обдумування як звичайний пошук
+                ponderhit()
+                search_tbt, chosen_move_tuple_tbt = ponder_search, ponder_result
+                ponder_move, ponder_search, ponder_result = 0, None, None
+            else:
+                cancel_pondering()
+                # Пошук іде на копії: між квантами цикл кадрів малює дошку з position
+                search_tbt = search_hard_bot_move(position.copy(), bot_color, slice_ms_hb=BOT_FRAME_SLICE_MS)
+            while search_tbt is not None:
+                try:
+                    next(search_tbt)
+                except StopIteration as stop_tbt:
+                    chosen_move_tuple_tbt = stop_tbt.value
+                    break
+                bot_thinking_message = "Бот думає" + "." * (int(time.perf_counter() * 3) % 4)
+                await asyncio.sleep(0)
         
         await asyncio.sleep(0.25)
 
-        if chosen_move_tuple_tbt:
-            start_pos, end_pos = chosen_move_tuple_tbt
+        if chosen_move_tuple_tbt is not None:
+            start_pos = (square_row(move_from(chosen_move_tuple_tbt)), square_col(move_from(chosen_move_tuple_tbt)))
+            end_pos = (square_row(move_to(chosen_move_tuple_tbt)), square_col(move_to(chosen_move_tuple_tbt)))
             possible_moves.clear()
             selected_piece = None
-            make_move(start_pos, end_pos)
+            make_move(start_pos, end_pos, move_promo(chosen_move_tuple_tbt) or QUEEN)
+            if bot_difficulty == 'hard' and BOT_PONDER and game_state == 'playing':
+                ponder_move, ponder_search = start_pondering(position, bot_color, BOT_FRAME_SLICE_MS)
         else:
             check_game_over_conditions(bot_color)
 
@@ -704,15 +520,23 @@ async def trigger_bot_turn():
         pygame.display.set_caption("Шахи")
 
 async def main():
-    global game_state, game_mode, bot_difficulty, player_chosen_color, selected_piece, possible_moves
+    global game_state, game_mode, bot_difficulty, player_chosen_color, selected_piece, possible_moves, show_search_panel
     game_state = 'main_menu'
     running = True
+    bot_task_main = None
+    ponder_task_main = None
 
     while running:
         mouse_pos_frame_main = pygame.mouse.get_pos()
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
                 running = False
+            if event.type == pygame.KEYDOWN and event.key == pygame.K_p and position is not None:
+                # PGN і FEN поточної партії — у консоль (під pygbag це консоль браузера)
+                print(get_game_pgn())
+                print(position.to_fen())
+            if event.type == pygame.KEYDOWN and event.key == pygame.K_i:
+                show_search_panel = not show_search_panel
             if event.type == pygame.MOUSEBUTTONDOWN:
                 if event.button == 1:
                     if game_state == 'main_menu':
@@ -750,38 +574,43 @@ async def main():
                                         new_piece_main = BOARD[clicked_row_main][clicked_col_main]
                                         if new_piece_main and get_piece_color(new_piece_main) == current_turn:
                                             selected_piece = (clicked_row_main, clicked_col_main)
-                                            possible_moves = get_possible_moves(clicked_row_main, clicked_col_main, BOARD, castling_rights)
+                                            possible_moves = get_possible_moves(clicked_row_main, clicked_col_main, position)
                                         else: selected_piece = None; possible_moves = []
                                 else: 
                                     piece_at_click_main = BOARD[clicked_row_main][clicked_col_main]
                                     if piece_at_click_main and get_piece_color(piece_at_click_main) == current_turn:
                                         selected_piece = (clicked_row_main, clicked_col_main)
-                                        possible_moves = get_possible_moves(clicked_row_main, clicked_col_main, BOARD, castling_rights)
+                                        possible_moves = get_possible_moves(clicked_row_main, clicked_col_main, position)
                                     else:
                                         selected_piece = None; possible_moves = []
                             else: selected_piece = None; possible_moves = []
                     
-                    elif "checkmate" in game_state or "stalemate" in game_state:
+                    elif "checkmate" in game_state or game_state.endswith("_draw"):
                         game_over_btn_rect = pygame.Rect(SCREEN_WIDTH // 2 - 100, SCREEN_HEIGHT // 2 + 20, 200, 50)
                         if game_over_btn_rect.collidepoint(mouse_pos_frame_main):
                             game_state = 'main_menu'
         
         if game_state == 'playing' and game_mode == 'pve' and current_turn == bot_color and not bot_is_thinking:
-            await trigger_bot_turn()
+            # Бот думає в окремій задачі, а цикл продовжує малювати кадри й обробляти події
+            if bot_task_main is None or bot_task_main.done():
+                bot_task_main = asyncio.create_task(trigger_bot_turn())
+        elif game_state == 'playing' and ponder_search is not None and current_turn != bot_color:
+            if ponder_task_main is None or ponder_task_main.done():
+                ponder_task_main = asyncio.create_task(ponder_bot_turn())
 
         SCREEN.fill(BACKGROUND_COLOR)
         if game_state == 'main_menu': draw_main_menu(mouse_pos_frame_main)
         elif game_state == 'mode_selection_menu': draw_mode_selection_menu(mouse_pos_frame_main)
         elif game_state == 'bot_difficulty_menu': draw_bot_difficulty_menu(mouse_pos_frame_main)
         elif game_state == 'bot_color_menu': draw_bot_color_menu(mouse_pos_frame_main)
-        elif game_state == 'playing' or "checkmate" in game_state or "stalemate" in game_state :
+        elif game_state == 'playing' or "checkmate" in game_state or game_state.endswith("_draw"):
             SCREEN.fill(GAME_BACKGROUND_COLOR)
             draw_board_and_notations()
             if game_state == 'playing':
                  draw_highlight()
             draw_pieces()
             draw_game_log()
-            if "checkmate" in game_state or "stalemate" in game_state:
+            if "checkmate" in game_state or game_state.endswith("_draw"):
                 draw_game_over_screen()
 
         pygame.display.flip()
@@ -0,0 +1,132 @@
+# --- Perft: перевірка коректності та швидкості генератора ходів ---
+# Запуск без вікна pygame:
+#   python perft.py perft --depth 4 [--fen FEN] [--divide]
+#   python perft.py suite [--max-nodes 2000000]
+#   python perft.py bench [--seconds 2]
+import argparse
+import sys
+import time
+
+from engine import Position, START_FEN, move_to_uci
+
+# --- Стандартні позиції perft (FEN, {глибина: кількість вузлів}) ---
+PERFT_POSITIONS = [
+    ("start", START_FEN,
+     {1: 20, 2: 400, 3: 8902, 4: 197281, 5: 4865609}),
+    ("kiwipete", "r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1",
+     {1: 48, 2: 2039, 3: 97862, 4: 4085603}),
+    ("position3", "8/2p5/3p4/KP5r/1R3p1k/8/4P1P1/8 w - - 0 1",
+     {1: 14, 2: 191, 3: 2812, 4: 43238, 5: 674624}),
+    ("position4", "r3k2r/Pppp1ppp/1b3nbN/nP6/BBP1P3/q4N2/Pp1P2PP/R2Q1RK1 w kq - 0 1",
+     {1: 6, 2: 264, 3: 9467, 4: 422333}),
+    ("position4_mirrored", "r2q1rk1/pP1p2pp/Q4n2/bbp1p3/Np6/1B3NBn/pPPP1PPP/R3K2R b KQ - 0 1",
+     {1: 6, 2: 264, 3: 9467, 4: 422333}),
+    ("position5", "rnbq1k1r/pp1Pbppp/2p5/8/2B5/8/PPP1NnPP/RNBQK2R w KQ - 1 8",
+     {1: 44, 2: 1486, 3: 62379, 4: 2103487}),
+    ("position6", "r4rk1/1pp1qppp/p1np1n2/2b1p1B1/2B1P1b1/P1NP1N2/1PP1QPPP/R4RK1 w - - 0 10",
+     {1: 46, 2: 2079, 3: 89890, 4: 3894594}),
+]
+
+def perft(position, depth):
+    if depth == 0: return 1
+    moves = position.legal_moves()
+    if depth == 1: return len(moves)
+    nodes = 0
+    for move in moves:
+        position.make_move(move)
+        nodes += perft(position, depth - 1)
+        position.unmake_move()
+    return nodes
+
+def divide(position, depth):
+    results = []
+    for move in position.legal_moves():
+        position.make_move(move)
+        results.append((move_to_uci(move), perft(position, depth - 1)))
+        position.unmake_move()
+    return results
+
+def run_suite(max_nodes):
+    failures = 0
+    for name, fen, expected in PERFT_POSITIONS:
+        position = Position.from_fen(fen)
+        for depth, expected_nodes in sorted(expected.items()):
+            if expected_nodes > max_nodes: break
+            start_time = time.perf_counter()
+            nodes = perft(position, depth)
+            elapsed = time.perf_counter() - start_time
+            status = "OK" if nodes == expected_nodes else "ПОМИЛКА"
+            if nodes != expected_nodes: failures += 1
+            print(f"{status:8} {name:20} depth {depth}: {nodes} (очікувалось {expected_nodes}), {elapsed:.2f} с")
+    return failures
+
+def run_bench(seconds):
+    positions = [Position.from_fen(fen) for _, fen, _ in PERFT_POSITIONS]
+
+    # Повний список ходів (те, що робить get_all_valid_moves_for_bot)
+    calls, moves_total = 0, 0
+    start_time = time.perf_counter()
+    while time.perf_counter() - start_time < seconds:
+        for position in positions:
+            moves_total += len(position.legal_moves())
+            calls += 1
+    elapsed = time.perf_counter() - start_time
+    print(f"legal_moves:      {calls / elapsed:10.0f} викликів/с, {moves_total / elapsed:10.0f} ходів/с")
+
+    # Ходи однієї фігури (те, що робить get_possible_moves)
+    calls = 0
+    start_time = time.perf_counter()
+    while time.perf_counter() - start_time < seconds:
+        for position in positions:
+            us = position.side
+            for sq in range(64):
+                piece = position.board[sq]
+                if piece and piece >> 3 == us:
+                    position.legal_moves_from(sq)
+                    calls += 1
+    elapsed = time.perf_counter() - start_time
+    print(f"legal_moves_from: {calls / elapsed:10.0f} викликів/с")
+
+    # Perft із make/unmake
+    nodes = 0
+    start_time = time.perf_counter()
+    while time.perf_counter() - start_time < seconds:
+        for position in positions:
+            nodes += perft(position, 2)
+    elapsed = time.perf_counter() - start_time
+    print(f"perft:            {nodes / elapsed:10.0f} вузлів/с")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Perft і бенчмарк генератора ходів")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    perft_parser = subparsers.add_parser("perft")
+    perft_parser.add_argument("--fen", default=START_FEN)
+    perft_parser.add_argument("--depth", type=int, default=4)
+    perft_parser.add_argument("--divide", action="store_true")
+    suite_parser = subparsers.add_parser("suite")
+    suite_parser.add_argument("--max-nodes", type=int, default=2000000)
+    bench_parser = subparsers.add_parser("bench")
+    bench_parser.add_argument("--seconds", type=float, default=2.0)
+    args = parser.parse_args(argv)
+
+    if args.command == "perft":
+        position = Position.from_fen(args.fen)
+        start_time = time.perf_counter()
+        if args.divide:
+            results = divide(position, args.depth)
+            for uci, nodes in results:
+                print(f"{uci}: {nodes}")
+            total = sum(nodes for _, nodes in results)
+        else:
+            total = perft(position, args.depth)
+        elapsed = time.perf_counter() - start_time
+        print(f"Вузлів: {total}, час: {elapsed:.2f} с, {total / max(elapsed, 1e-9):.0f} вузлів/с")
+        return 0
+    if args.command == "suite":
+        return 1 if run_suite(args.max_nodes) else 0
+    if args.command == "bench":
+        run_bench(args.seconds)
+        return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,61 @@
+# --- Експорт партії у PGN ---
+import time
+
+from engine import START_FEN, WHITE, initial_position, move_to_san
+
+PGN_LINE_WIDTH = 80
+PGN_RESULTS = ("1-0", "0-1", "1/2-1/2", "*")
+
+def game_moves(position):
+    # Партія відновлюється зі стеку відкату: (початкова позиція, список ходів)
+    start_position = position.copy()
+    start_position.unmake_to(0)
+    return start_position, [entry[0] for entry in position.undo_stack]
+
+def export_pgn(moves, start_position=None, headers=None, result="*"):
+    if result not in PGN_RESULTS:
+        raise ValueError(f"Некоректний результат PGN: '{result}'")
+    if start_position is None:
+        start_position = initial_position()
+    tags = {
+        "Event": "Шахи",
+        "Site": "pygame-web",
+        "Date": time.strftime("%Y.%m.%d"),
+        "Round": "-",
+        "White": "?",
+        "Black": "?",
+    }
+    if headers:
+        tags.update(headers)
+    tags["Result"] = result
+    start_fen = start_position.to_fen()
+    if start_fen != START_FEN:
+        tags["SetUp"] = "1"
+        tags["FEN"] = start_fen
+
+    tokens = []
+    position = start_position.copy()
+    for move in moves:
+        if position.side == WHITE:
+            tokens.append(f"{position.fullmove_number}.")
+        elif not tokens:
+            tokens.append(f"{position.fullmove_number}...")
+        tokens.append(move_to_san(position, move))
+        position.make_move(move)
+    tokens.append(result)
+
+    lines = [f'[{name} "{value}"]' for name, value in tags.items()]
+    lines.append("")
+    line = ""
+    for token in tokens:
+        if line and len(line) + 1 + len(token) > PGN_LINE_WIDTH:
+            lines.append(line)
+            line = token
+        else:
+            line = f"{line} {token}" if line else token
+    lines.append(line)
+    return "\n".join(lines) + "\n"
+
+def export_position_pgn(position, headers=None, result="*"):
+    start_position, moves = game_moves(position)
+    return export_pgn(moves, start_position, headers, result)
@@ -0,0 +1,241 @@
+import time
+
+from engine import EMPTY, PAWN, FLAG_EN_PASSANT
+
+# --- Допоміжні структури пошуку бота ---
+
+# --- Таблиця транспозицій ---
+BOUND_EXACT, BOUND_LOWER, BOUND_UPPER = 0, 1, 2
+
+# Приблизний розмір одного запису в CPython: кортеж із 6 полів плюс 64-бітний ключ і слот списку
+TT_ENTRY_SIZE_BYTES = 160
+
+class TranspositionTable:
+    # Запис: (ключ, глибина, тип межі, оцінка з погляду сторони, що ходить, найкращий хід, покоління)
+    def __init__(self, size_mb=8):
+        self.resize(size_mb)
+
+    def resize(self, size_mb):
+        entries = max(1, int(size_mb * 1024 * 1024) // TT_ENTRY_SIZE_BYTES)
+        # Розмір — степінь двійки, щоб індекс рахувався маскою
+        size = 1
+        while size * 2 <= entries:
+            size *= 2
+        self.size = size
+        self.mask = size - 1
+        self.entries = [None] * size
+        self.generation = 0
+
+    def clear(self):
+        self.entries = [None] * self.size
+        self.generation = 0
+
+    def new_search(self):
+        self.generation += 1
+
+    def probe(self, key):
+        entry = self.entries[key & self.mask]
+        if entry is not None and entry[0] == key:
+            return entry
+        return None
+
+    def store(self, key, depth, bound, score, move):
+        index = key & self.mask
+        old = self.entries[index]
+        if old is not None:
+            if old[0] != key and old[5] == self.generation and old[1] > depth:
+                # Заміна: глибший запис поточного пошуку лишається, застарілі й мілкіші — витісняються
+                return
+            if old[0] == key and not move:
+                move = old[4]
+        self.entries[index] = (key, depth, bound, score, move, self.generation)
+
+# --- Оцінки мату ---
+# Мат через ply півходів від кореня оцінюється як MATE_SCORE - ply, тож ближчий мат кращий
+MATE_SCORE = 100000
+INFINITE_SCORE = MATE_SCORE + 1
+
+# --- Впорядкування ходів ---
+ORDER_TT_MOVE = 1 << 30
+ORDER_CAPTURE = 1 << 24
+ORDER_KILLER_FIRST = ORDER_CAPTURE - 1
+ORDER_KILLER_SECOND = ORDER_CAPTURE - 2
+HISTORY_LIMIT = ORDER_KILLER_SECOND - 1
+MAX_SEARCH_PLY = 128
+# Оцінки за цією межею означають мат, відомий у межах дерева пошуку
+MATE_BOUND = MATE_SCORE - MAX_SEARCH_PLY
+
+def mvv_lva(victim_type, attacker_type):
+    # Найцінніша жертва, найдешевший нападник: спочатку ферзь пішаком, наприкінці пішак ферзем
+    return victim_type * 8 - attacker_type
+
+def score_to_tt(score, ply):
+    # У таблиці мат рахується від поточного вузла, а не від кореня, щоб запис лишався вірним при транспозиціях
+    if score >= MATE_BOUND: return score + ply
+    if score <= -MATE_BOUND: return score - ply
+    return score
+
+def score_from_tt(score, ply):
+    if score >= MATE_BOUND: return score - ply
+    if score <= -MATE_BOUND: return score + ply
+    return score
+
+class MoveOrderer:
+    def __init__(self):
+        self.killers = [[0, 0] for _ in range(MAX_SEARCH_PLY)]
+        # history[код фігури][клітинка призначення]
+        self.history = [[0] * 64 for _ in range(15)]
+
+    def clear(self):
+        self.killers = [[0, 0] for _ in range(MAX_SEARCH_PLY)]
+        self.history = [[0] * 64 for _ in range(15)]
+
+    def new_search(self):
+        # Вбивці прив'язані до ply попереднього пошуку, а історію лише послаблюємо
+        self.killers = [[0, 0] for _ in range(MAX_SEARCH_PLY)]
+        for row in self.history:
+            for to_sq in range(64):
+                row[to_sq] >>= 1
+
+    def score_move(self, board, move, tt_move, killers):
+        if move == tt_move: return ORDER_TT_MOVE
+        to_sq = (move >> 6) & 63
+        victim = board[to_sq]
+        promo = (move >> 12) & 7
+        if victim or promo or move >> 15 == FLAG_EN_PASSANT:
+            attacker_type = board[move & 63] & 7
+            victim_type = victim & 7 if victim else PAWN if move >> 15 == FLAG_EN_PASSANT else EMPTY
+            return ORDER_CAPTURE + mvv_lva(victim_type + promo, attacker_type)
+        if move == killers[0]: return ORDER_KILLER_FIRST
+        if move == killers[1]: return ORDER_KILLER_SECOND
+        return self.history[board[move & 63]][to_sq]
+
+    def order(self, position, moves, tt_move=0, ply=0):
+        board = position.board
+        killers = self.killers[min(ply, MAX_SEARCH_PLY - 1)]
+        score_move = self.score_move
+        moves.sort(key=lambda move: score_move(board, move, tt_move, killers), reverse=True)
+        return moves
+
+    def record_cutoff(self, position, move, depth, ply):
+        board = position.board
+        if board[(move >> 6) & 63] or (move >> 12) & 7 or move >> 15 == FLAG_EN_PASSANT:
+            return
+        killers = self.killers[min(ply, MAX_SEARCH_PLY - 1)]
+        if killers[0] != move:
+            killers[1] = killers[0]
+            killers[0] = move
+        history_row = self.history[board[move & 63]]
+        history_row[(move >> 6) & 63] = min(HISTORY_LIMIT, history_row[(move >> 6) & 63] + depth * depth)
+
+# --- Статистика пошуку ---
+class SearchStats:
+    # Лічильники вузлів, таблиці транспозицій і спрацювань кожного прийому відсікання за один пошук,
+    # плюс підсумок кожної завершеної ітерації поглиблення
+    FIELDS = (
+        "nodes", "qnodes", "tt_probes", "tt_hits", "tt_cutoffs", "tablebase_hits", "null_move_tries", "null_move_cutoffs",
+        "lmr_reductions", "lmr_researches", "pvs_researches", "aspiration_researches",
+    )
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        for field in self.FIELDS:
+            setattr(self, field, 0)
+        self.time_ms = 0.0
+        self.iterations = []
+
+    def record_iteration(self, depth, score, time_ms, pv):
+        # nodes — сумарно від початку пошуку (основні та форсовані вузли)
+        self.iterations.append({"depth": depth, "score": score, "nodes": self.nodes + self.qnodes, "time_ms": round(time_ms, 1), "pv": pv})
+
+    def branching_factor(self):
+        # Ефективний коефіцієнт розгалуження: у скільки разів зросла робота останньої ітерації порівняно з попередньою
+        if len(self.iterations) < 2: return 0.0
+        previous_start = self.iterations[-3]["nodes"] if len(self.iterations) >= 3 else 0
+        previous_nodes = self.iterations[-2]["nodes"] - previous_start
+        last_nodes = self.iterations[-1]["nodes"] - self.iterations[-2]["nodes"]
+        return last_nodes / previous_nodes if previous_nodes else 0.0
+
+    def as_dict(self):
+        result = {field: getattr(self, field) for field in self.FIELDS}
+        result["time_ms"] = round(self.time_ms, 1)
+        result["branching_factor"] = round(self.branching_factor(), 2)
+        result["iterations"] = list(self.iterations)
+        return result
+
+def format_score(score):
+    # Оцінка в сотих пішака або "mate N" (N ходів, мінус — мат нам)
+    if abs(score) >= MATE_BOUND:
+        moves_to_mate = (MATE_SCORE - abs(score) + 1) // 2
+        return f"mate {moves_to_mate if score > 0 else -moves_to_mate}"
+    return f"cp {score}"
+
+# --- Контроль часу пошуку ---
+class SearchTimeout(Exception):
+    pass
+
+class SearchClock:
+    # Годинник перевіряється раз на CHECK_INTERVAL_NODES вузлів, щоб не викликати perf_counter у кожному вузлі
+    CHECK_INTERVAL_NODES = 256
+
+    def __init__(self, budget_ms=None, slice_ms=None):
+        self.start_time = time.perf_counter()
+        self.set_budget(budget_ms)
+        self.nodes = 0
+        self.enabled = False
+        # Кооперативний режим: раз на slice_ms пошук має віддати керування циклу кадрів
+        self.slice_seconds = None if slice_ms is None else slice_ms / 1000.0
+        self.slice_end = None if slice_ms is None else self.start_time + self.slice_seconds
+        self.yield_due = False
+
+    def tick(self):
+        self.nodes += 1
+        if self.nodes % self.CHECK_INTERVAL_NODES: return
+        now = time.perf_counter()
+        if self.enabled and self.deadline is not None and now >= self.deadline:
+            raise SearchTimeout()
+        if self.slice_end is not None and now >= self.slice_end:
+            self.yield_due = True
+
+    def resume(self):
+        # Викликається після повернення керування: новий квант відраховується від цього моменту
+        self.yield_due = False
+        if self.slice_seconds is not None:
+            self.slice_end = time.perf_counter() + self.slice_seconds
+
+    def set_budget(self, budget_ms):
+        # Бюджет відраховується від початку пошуку; None — без обмеження (обдумування на час суперника)
+        self.deadline = None if budget_ms is None else self.start_time + budget_ms / 1000.0
+
+    def elapsed_ms(self):
+        return (time.perf_counter() - self.start_time) * 1000.0
+
+    def out_of_time(self, fraction=1.0):
+        if self.deadline is None: return False
+        return time.perf_counter() >= self.start_time + (self.deadline - self.start_time) * fraction
+
+def run_to_completion(search):
+    # Синхронний прохід кооперативного пошуку-генератора до кінця; повертає його результат
+    try:
+        while True:
+            next(search)
+    except StopIteration as stop:
+        return stop.value
+
+# --- Головна варіація з таблиці транспозицій ---
+def principal_variation(position, table, max_length=32):
+    pv = []
+    seen_keys = set()
+    while len(pv) < max_length:
+        entry = table.probe(position.hash)
+        if entry is None or not entry[4] or position.hash in seen_keys: break
+        seen_keys.add(position.hash)
+        move = entry[4]
+        if move not in position.legal_moves(): break
+        pv.append(move)
+        position.make_move(move)
+    for _ in pv:
+        position.unmake_move()
+    return pv
@@ -0,0 +1,268 @@
+# --- Ендшпільні таблиці KQK, KRK, KPK ---
+# Будуються заздалегідь ретроградним аналізом (від матів назад) і зберігаються як стиснуті масиви байтів:
+#   python tablebase.py build
+#   python tablebase.py probe --fen "8/8/8/4k3/8/8/8/R3K3 w - - 0 1"
+# Індекс позиції: сторона, що ходить (0 — сильніша, 1 — слабша) << 18 | король сильнішої << 12 | фігура << 6 | король слабшої.
+# Сильніша сторона приводиться до білих (дзеркалом дошки по вертикалі), пішак завжди йде вгору.
+# Байт: 0 — нічия або неможлива позиція, n > 0 — сильніша сторона матує через n - 1 півходів.
+import argparse
+import os
+import sys
+import time
+import zlib
+
+from engine import Position, WHITE, KING, QUEEN, ROOK, PAWN, KNIGHT, BISHOP, START_FEN, move_to_uci
+
+TABLEBASE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "tablebases")
+TABLEBASE_PIECES = {"kqk": QUEEN, "krk": ROOK, "kpk": PAWN}
+TABLEBASE_NAMES = {piece: name for name, piece in TABLEBASE_PIECES.items()}
+TABLEBASE_SIZE = 2 << 18
+WEAK_TO_MOVE = 1 << 18
+
+# --- Геометрія дошки (sq = row * 8 + col, row 0 — восьма горизонталь) ---
+KING_DIRECTIONS = [(-1, -1), (-1, 0), (-1, 1), (0, -1), (0, 1), (1, -1), (1, 0), (1, 1)]
+ROOK_DIRECTIONS = [(-1, 0), (1, 0), (0, -1), (0, 1)]
+QUEEN_DIRECTIONS = KING_DIRECTIONS
+
+def _on_board(row, col):
+    return 0 <= row < 8 and 0 <= col < 8
+
+KING_TARGETS = [
+    [(sq // 8 + dr) * 8 + sq % 8 + dc for dr, dc in KING_DIRECTIONS if _on_board(sq // 8 + dr, sq % 8 + dc)]
+    for sq in range(64)
+]
+KING_NEAR = [set(targets) for targets in KING_TARGETS]
+
+def _rays(directions):
+    rays = []
+    for sq in range(64):
+        sq_rays = []
+        for dr, dc in directions:
+            ray = []
+            row, col = sq // 8 + dr, sq % 8 + dc
+            while _on_board(row, col):
+                ray.append(row * 8 + col)
+                row, col = row + dr, col + dc
+            if ray: sq_rays.append(ray)
+        rays.append(sq_rays)
+    return rays
+
+PIECE_RAYS = {QUEEN: _rays(QUEEN_DIRECTIONS), ROOK: _rays(ROOK_DIRECTIONS)}
+
+def _between_masks(directions):
+    # between[a][b] — маска полів строго між a і b, або None, якщо фігура з a не б'є по лінії на b
+    between = [[None] * 64 for _ in range(64)]
+    for sq, sq_rays in enumerate(_rays(directions)):
+        for ray in sq_rays:
+            mask = 0
+            for target in ray:
+                between[sq][target] = mask
+                mask |= 1 << target
+    return between
+
+PIECE_BETWEEN = {QUEEN: _between_masks(QUEEN_DIRECTIONS), ROOK: _between_masks(ROOK_DIRECTIONS)}
+# Білий пішак на sq б'є поля на рядок вище
+PAWN_ATTACKS = [
+    {(sq // 8 - 1) * 8 + sq % 8 + dc for dc in (-1, 1) if _on_board(sq // 8 - 1, sq % 8 + dc)}
+    for sq in range(64)
+]
+
+def _attacks(piece, piece_sq, target, blocker):
+    # Чи б'є фігура сильнішої сторони поле target; blocker — король сильнішої, єдина можлива перешкода
+    if piece == PAWN:
+        return target in PAWN_ATTACKS[piece_sq]
+    mask = PIECE_BETWEEN[piece][piece_sq][target]
+    return mask is not None and not (mask >> blocker) & 1
+
+def _placement_ok(piece, strong_king, piece_sq, weak_king):
+    if strong_king == piece_sq or weak_king == piece_sq or strong_king == weak_king: return False
+    if weak_king in KING_NEAR[strong_king]: return False
+    return piece != PAWN or 1 <= piece_sq // 8 <= 6
+
+# --- Ретроградний аналіз ---
+def build_table(piece, promotion_tables=None):
+    # promotion_tables — готові таблиці {фігура: bytes} для перетворення пішака (лише для KPK)
+    result = bytearray(TABLEBASE_SIZE)
+    done = bytearray(TABLEBASE_SIZE)
+    # Для позицій зі слабшою стороною на ходу — скільки її ходів ще не доведено як програшні
+    remaining = [0] * WEAK_TO_MOVE
+    buckets = [[]]
+
+    def push(depth, index):
+        while len(buckets) <= depth:
+            buckets.append([])
+        buckets[depth].append(index)
+
+    for strong_king in range(64):
+        for piece_sq in range(64):
+            for weak_king in range(64):
+                if not _placement_ok(piece, strong_king, piece_sq, weak_king): continue
+                index = strong_king << 12 | piece_sq << 6 | weak_king
+                in_check = _attacks(piece, piece_sq, weak_king, strong_king)
+                # Перетворення пішака: виграш переходить у таблицю KQK чи KRK зі слабшою стороною на ходу
+                if promotion_tables and piece_sq // 8 == 1 and not in_check and piece_sq - 8 not in (strong_king, weak_king):
+                    promoted_index = WEAK_TO_MOVE | strong_king << 12 | (piece_sq - 8) << 6 | weak_king
+                    depths = [table[promoted_index] for table in promotion_tables.values() if table[promoted_index]]
+                    if depths:
+                        push(min(depths), index)
+                moves = 0
+                for target in KING_TARGETS[weak_king]:
+                    if target in KING_NEAR[strong_king]: continue
+                    if target == piece_sq or not _attacks(piece, piece_sq, target, strong_king):
+                        moves += 1
+                if moves:
+                    remaining[index] = moves
+                elif in_check:
+                    # Мат: слабша сторона на ходу й не має ходів під шахом
+                    done[WEAK_TO_MOVE | index] = 1
+                    push(0, WEAK_TO_MOVE | index)
+
+    depth = 0
+    while depth < len(buckets):
+        for index in buckets[depth]:
+            weak_to_move = index & WEAK_TO_MOVE
+            if not weak_to_move:
+                if done[index]: continue
+                done[index] = 1
+            result[index] = depth + 1
+            strong_king, piece_sq, weak_king = (index >> 12) & 63, (index >> 6) & 63, index & 63
+            if weak_to_move:
+                # Слабша сторона програє: кожен хід сильнішої, що веде сюди, виграє через depth + 1 півходів
+                for previous in _strong_unmoves(piece, strong_king, piece_sq, weak_king):
+                    if not done[previous]:
+                        push(depth + 1, previous)
+            else:
+                # Сильніша виграє: у попередника слабшої сторони стало на один невиграшний хід менше
+                for previous_king in KING_TARGETS[weak_king]:
+                    if previous_king in KING_NEAR[strong_king] or previous_king == piece_sq: continue
+                    previous = strong_king << 12 | piece_sq << 6 | previous_king
+                    if done[WEAK_TO_MOVE | previous] or not remaining[previous]: continue
+                    remaining[previous] -= 1
+                    if not remaining[previous]:
+                        done[WEAK_TO_MOVE | previous] = 1
+                        push(depth + 1, WEAK_TO_MOVE | previous)
+        depth += 1
+    return bytes(result)
+
+def _strong_unmoves(piece, strong_king, piece_sq, weak_king):
+    # Позиції зі сильнішою стороною на ходу, з яких один її хід веде в (strong_king, piece_sq, weak_king).
+    # У попереднику слабший король не може стояти під шахом
+    for previous_king in KING_TARGETS[strong_king]:
+        if previous_king == piece_sq or previous_king in KING_NEAR[weak_king]: continue
+        if not _attacks(piece, piece_sq, weak_king, previous_king):
+            yield previous_king << 12 | piece_sq << 6 | weak_king
+    if piece == PAWN:
+        previous_squares = []
+        if piece_sq // 8 <= 5:
+            previous_squares.append(piece_sq + 8)
+            if piece_sq // 8 == 4 and piece_sq + 8 not in (strong_king, weak_king):
+                previous_squares.append(piece_sq + 16)
+    else:
+        previous_squares = []
+        for ray in PIECE_RAYS[piece][piece_sq]:
+            for previous_sq in ray:
+                if previous_sq == strong_king or previous_sq == weak_king: break
+                previous_squares.append(previous_sq)
+    for previous_sq in previous_squares:
+        if previous_sq in (strong_king, weak_king): continue
+        if not _attacks(piece, previous_sq, weak_king, strong_king):
+            yield strong_king << 12 | previous_sq << 6 | weak_king
+
+def build_tablebases(directory=TABLEBASE_DIR, log=print):
+    os.makedirs(directory, exist_ok=True)
+    tables = {}
+    for piece in (QUEEN, ROOK, PAWN):
+        start_time = time.perf_counter()
+        promotion_tables = {QUEEN: tables[QUEEN], ROOK: tables[ROOK]} if piece == PAWN else None
+        tables[piece] = build_table(piece, promotion_tables)
+        name = TABLEBASE_NAMES[piece]
+        data = zlib.compress(tables[piece], 9)
+        with open(os.path.join(directory, f"{name}.bin"), "wb") as table_file:
+            table_file.write(data)
+        wins = sum(1 for value in tables[piece] if value)
+        log(f"{name}: {wins} виграшних позицій, найдовший мат {max(tables[piece]) - 1} півходів, "
+            f"{len(data)} байт, {time.perf_counter() - start_time:.1f} с")
+    return tables
+
+# --- Звернення до таблиць ---
+class Tablebases:
+    def __init__(self, tables=None):
+        self.tables = tables or {}
+
+    @classmethod
+    def load(cls, directory=TABLEBASE_DIR):
+        # Відсутні файли просто пропускаються — такі ендшпілі бот рахує звичайним пошуком
+        tables = {}
+        for name, piece in TABLEBASE_PIECES.items():
+            try:
+                with open(os.path.join(directory, f"{name}.bin"), "rb") as table_file:
+                    tables[piece] = zlib.decompress(table_file.read())
+            except (OSError, zlib.error):
+                continue
+        return cls(tables)
+
+    def probe(self, position):
+        # (результат, півходи до мату) з погляду сторони, що ходить: 1 — виграє, 0 — нічия, -1 — програє;
+        # None, якщо матеріал не покривається таблицями
+        if position.castling: return None
+        pieces = [(sq, piece) for sq, piece in enumerate(position.board) if piece]
+        if len(pieces) > 3: return None
+        extra = [(sq, piece) for sq, piece in pieces if piece & 7 != KING]
+        if not extra: return 0, 0
+        piece_sq, piece = extra[0]
+        piece_type, strong = piece & 7, piece >> 3
+        # Однією легкою фігурою мат не поставити
+        if piece_type in (KNIGHT, BISHOP): return 0, 0
+        table = self.tables.get(piece_type)
+        if table is None: return None
+        flip = 0 if strong == WHITE else 56
+        strong_king, weak_king = position.king_sq[strong] ^ flip, position.king_sq[strong ^ 1] ^ flip
+        weak_to_move = position.side != strong
+        value = table[(WEAK_TO_MOVE if weak_to_move else 0) | strong_king << 12 | (piece_sq ^ flip) << 6 | weak_king]
+        if not value: return 0, 0
+        return (-1 if weak_to_move else 1), value - 1
+
+    def best_move(self, position):
+        # Хід, що найшвидше матує, або найдовше відтягує мат, або зберігає нічию; None поза таблицями
+        if self.probe(position) is None: return None
+        best_move, best_key = None, None
+        for move in position.legal_moves():
+            position.make_move(move)
+            probed = self.probe(position)
+            position.unmake_move()
+            if probed is None: return None
+            result, plies = probed
+            # Результат суперника після нашого ходу: його програш найкращий, потім нічия, потім його виграш
+            key = (-result, -plies if result < 0 else plies)
+            if best_key is None or key > best_key:
+                best_move, best_key = move, key
+        return best_move
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Побудова та перевірка ендшпільних таблиць")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    build_parser = subparsers.add_parser("build")
+    build_parser.add_argument("--output", default=TABLEBASE_DIR)
+    probe_parser = subparsers.add_parser("probe")
+    probe_parser.add_argument("--fen", default=START_FEN)
+    probe_parser.add_argument("--tablebases", default=TABLEBASE_DIR)
+    args = parser.parse_args(argv)
+
+    if args.command == "build":
+        build_tablebases(args.output)
+        return 0
+    if args.command == "probe":
+        tablebases = Tablebases.load(args.tablebases)
+        position = Position.from_fen(args.fen)
+        probed = tablebases.probe(position)
+        if probed is None:
+            print("Позиції немає в таблицях")
+            return 1
+        result, plies = probed
+        best_move = tablebases.best_move(position)
+        outcome = {1: f"виграш, мат через {plies} півходів", 0: "нічия", -1: f"програш, мат через {plies} півходів"}[result]
+        print(f"{outcome}; хід: {move_to_uci(best_move) if best_move else '-'}")
+        return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
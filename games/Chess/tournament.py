@@ -0,0 +1,231 @@
+# --- Турнір ботів без вікна pygame ---
+# Кожна пара гравців грає однакові дебюти двічі зі зміною кольорів; партії рахуються паралельно в процесах.
+#   python tournament.py --players easy medium hard --games 20 --time-ms 200 --workers 4
+#   python tournament.py --players hard hard_nolmr --variant "hard_nolmr=hard:SEARCH_USE_LMR=False"
+#   python tournament.py --players hard medium --search-log search.jsonl   (статистика кожного пошуку важкого бота)
+# Варіант: ім'я=базовий_бот:КОНСТАНТА=значення,... — константи модуля bot.py на час ходу цього гравця
+import argparse
+import ast
+import itertools
+import math
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import bot
+from book import BOOK_LINES, find_uci_move
+from engine import COLOR_NAMES, initial_position
+from search import MoveOrderer, TranspositionTable
+
+BASE_PLAYERS = {
+    "easy": "choose_easy_bot_move",
+    "medium": "choose_medium_bot_move",
+    "hard": "choose_hard_bot_move",
+}
+TOURNAMENT_MAX_PLIES = 300
+OPENING_MIN_PLIES = 2
+OPENING_MAX_PLIES = 8
+
+# --- Гравці та варіанти ---
+def parse_variant(spec):
+    # "ім'я=база:КЛЮЧ=значення,КЛЮЧ=значення" -> (ім'я, база, {ключ: значення})
+    name, _, definition = spec.partition("=")
+    base, _, settings = definition.partition(":")
+    if not name or base not in BASE_PLAYERS:
+        raise ValueError(f"Некоректний варіант: '{spec}'")
+    overrides = {}
+    for setting in filter(None, settings.split(",")):
+        key, _, value = setting.partition("=")
+        if not key.isupper() or not hasattr(bot, key):
+            raise ValueError(f"Невідома константа bot.py у варіанті '{spec}': {key}")
+        overrides[key] = ast.literal_eval(value)
+    return name, base, overrides
+
+class _PlayerState:
+    # Окремі таблиця транспозицій і впорядковувач для кожного гравця, щоб варіанти не ділили пам'ять пошуку.
+    # Таблиця створюється один раз на партію, тож її розмір береться з налаштувань варіанта одразу
+    def __init__(self, overrides):
+        self.transposition_table = TranspositionTable(overrides.get("BOT_TT_SIZE_MB", bot.BOT_TT_SIZE_MB))
+        self.move_orderer = MoveOrderer()
+        self.moves = 0
+        self.cpu_seconds = 0.0
+        # Вузли рахуються лише для ходів, знайдених пошуком (не з книги, таблиць чи без пошуку взагалі)
+        self.nodes = 0
+        self.searched_moves = 0
+
+def _choose_move(player, state, position):
+    name, base, overrides = player
+    saved = {key: getattr(bot, key) for key in overrides}
+    saved_tables = bot.transposition_table, bot.move_orderer
+    for key, value in overrides.items():
+        setattr(bot, key, value)
+    bot.transposition_table, bot.move_orderer = state.transposition_table, state.move_orderer
+    bot.search_stats.reset()
+    try:
+        start_cpu = time.process_time()
+        move = getattr(bot, BASE_PLAYERS[base])(position, COLOR_NAMES[position.side])
+        state.cpu_seconds += time.process_time() - start_cpu
+        state.moves += 1
+        # Статистику заповнює лише пошук важкого бота (паралельний пошук підсумовує лічильники без ітерацій)
+        if bot.search_stats.iterations or bot.search_stats.nodes:
+            state.nodes += bot.search_stats.nodes + bot.search_stats.qnodes
+            state.searched_moves += 1
+    finally:
+        for key, value in saved.items():
+            setattr(bot, key, value)
+        bot.transposition_table, bot.move_orderer = saved_tables
+    return move
+
+# --- Одна партія ---
+def play_game(white, black, opening, think_time_ms, max_plies, seed, search_log=None):
+    # Виконується в процесі пулу; повертає лише прості типи, щоб результат легко передавався назад
+    random.seed(seed)
+    bot.BOT_THINK_TIME_MS = think_time_ms
+    bot.BOT_USE_OPENING_BOOK = False
+    bot.BOT_PARALLEL_WORKERS = 0
+    bot.SEARCH_LOG_PATH = search_log
+    position = initial_position()
+    for uci in opening:
+        position.make_move(find_uci_move(position, uci))
+    players = (white, black)
+    states = (_PlayerState(white[2]), _PlayerState(black[2]))
+    result, reason = "1/2-1/2", "max_plies"
+    while len(position.undo_stack) < max_plies:
+        if not position.has_any_legal_move():
+            if position.in_check():
+                result, reason = ("0-1" if position.side == 0 else "1-0"), "checkmate"
+            else:
+                result, reason = "1/2-1/2", "stalemate"
+            break
+        if position.is_fifty_move_draw():
+            result, reason = "1/2-1/2", "fifty_moves"
+            break
+        if position.is_threefold_repetition():
+            result, reason = "1/2-1/2", "repetition"
+            break
+        move = _choose_move(players[position.side], states[position.side], position)
+        position.make_move(move)
+    return {
+        "white": white[0],
+        "black": black[0],
+        "result": result,
+        "reason": reason,
+        "plies": len(position.undo_stack),
+        "stats": {players[side][0]: (states[side].moves, states[side].cpu_seconds, states[side].nodes, states[side].searched_moves)
+                  for side in (0, 1)},
+    }
+
+# --- Підсумки ---
+def elo_difference(wins, draws, losses):
+    # Різниця Ело за набраними очками і півширина 95% довірчого інтервалу
+    games = wins + draws + losses
+    # Лише нічиї: дисперсія нульова, тож інтервал за нею не оцінити — вважаємо його необмеженим
+    if not games or not wins and not losses: return 0.0, float("inf")
+    score = (wins + draws * 0.5) / games
+    variance = (wins * (1 - score) ** 2 + draws * (0.5 - score) ** 2 + losses * score ** 2) / games
+    margin = 1.96 * math.sqrt(variance / games)
+
+    def to_elo(p):
+        if p <= 0: return -float("inf")
+        if p >= 1: return float("inf")
+        return -400.0 * math.log10(1.0 / p - 1.0)
+
+    upper, lower = to_elo(min(score + margin, 1.0)), to_elo(max(score - margin, 0.0))
+    # Інтервал сягає 0% чи 100% очок (зокрема без поразок чи без перемог) — його межа в Ело нескінченна
+    if math.isinf(upper) or math.isinf(lower): return to_elo(score) + 0.0, float("inf")
+    return to_elo(score) + 0.0, (upper - lower) / 2
+
+def make_openings(count, seed):
+    rng = random.Random(seed)
+    openings = []
+    for _ in range(count):
+        line = rng.choice(BOOK_LINES).split()
+        openings.append(line[:rng.randint(OPENING_MIN_PLIES, min(OPENING_MAX_PLIES, len(line)))])
+    return openings
+
+def run_tournament(players, games_per_pair, think_time_ms, workers, seed, max_plies=TOURNAMENT_MAX_PLIES, search_log=None):
+    openings = make_openings((games_per_pair + 1) // 2, seed)
+    jobs = []
+    for first, second in itertools.combinations(players, 2):
+        for index, opening in enumerate(openings):
+            # Кожен дебют — двічі, зі зміною кольорів
+            jobs.append((first, second, opening, think_time_ms, max_plies, seed * 100003 + len(jobs), search_log))
+            if 2 * index + 1 < games_per_pair:
+                jobs.append((second, first, opening, think_time_ms, max_plies, seed * 100003 + len(jobs), search_log))
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(play_game, *job) for job in jobs]
+            return [future.result() for future in futures]
+    return [play_game(*job) for job in jobs]
+
+def summarize(players, results):
+    lines = []
+    names = [player[0] for player in players]
+    totals = {name: [0, 0.0, 0, 0] for name in names}
+    for game in results:
+        for name, stats in game["stats"].items():
+            for index, value in enumerate(stats):
+                totals[name][index] += value
+    for first, second in itertools.combinations(names, 2):
+        wins = draws = losses = 0
+        for game in results:
+            if {game["white"], game["black"]} != {first, second}: continue
+            if game["result"] == "1/2-1/2":
+                draws += 1
+            elif (game["result"] == "1-0") == (game["white"] == first):
+                wins += 1
+            else:
+                losses += 1
+        elo, margin = elo_difference(wins, draws, losses)
+        lines.append(f"{first} - {second}: +{wins} ={draws} -{losses}, Ело {elo:+.0f} ± {margin:.0f}")
+    for name in names:
+        moves, cpu_seconds, nodes, searched_moves = totals[name]
+        moves = max(moves, 1)
+        # Боти без пошуку вузлів не рахують
+        nodes_per_move = f"{nodes / searched_moves:.0f}" if searched_moves else "n/a"
+        lines.append(f"{name}: {cpu_seconds * 1000 / moves:.1f} мс CPU/хід, {nodes_per_move} вузлів/хід")
+    reasons = {}
+    for game in results:
+        reasons[game["reason"]] = reasons.get(game["reason"], 0) + 1
+    lines.append("Завершення партій: " + ", ".join(f"{reason} {count}" for reason, count in sorted(reasons.items())))
+    return "\n".join(lines)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Турнір шахових ботів без графічного інтерфейсу")
+    parser.add_argument("--players", nargs="+", default=["easy", "medium", "hard"])
+    parser.add_argument("--variant", action="append", default=[], help="ім'я=база:КОНСТАНТА=значення,...")
+    parser.add_argument("--games", type=int, default=10, help="партій на кожну пару гравців")
+    parser.add_argument("--time-ms", type=int, default=200, help="час важкого бота на хід, мс")
+    parser.add_argument("--workers", type=int, default=1, help="кількість процесів")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--max-plies", type=int, default=TOURNAMENT_MAX_PLIES)
+    parser.add_argument("--search-log", help="файл, куди дописуються рядки JSON зі статистикою пошуку")
+    args = parser.parse_args(argv)
+
+    try:
+        variants = {name: (name, base, overrides) for name, base, overrides in map(parse_variant, args.variant)}
+    except ValueError as error:
+        print(error, file=sys.stderr)
+        return 2
+    players = []
+    for name in args.players:
+        if name in variants:
+            players.append(variants[name])
+        elif name in BASE_PLAYERS:
+            players.append((name, name, {}))
+        else:
+            print(f"Невідомий гравець: {name}", file=sys.stderr)
+            return 2
+    if len({player[0] for player in players}) != len(players) or len(players) < 2:
+        print("Потрібно щонайменше два гравці з різними іменами", file=sys.stderr)
+        return 2
+
+    start_time = time.perf_counter()
+    results = run_tournament(players, args.games, args.time_ms, args.workers, args.seed, args.max_plies, args.search_log)
+    print(summarize(players, results))
+    print(f"Партій: {len(results)}, час: {time.perf_counter() - start_time:.1f} с")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())